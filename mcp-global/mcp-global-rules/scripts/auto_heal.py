@@ -15,22 +15,25 @@ Usage:
     python mcp.py heal --learn "lesson"   # Manually add lesson
 """
 
-import json
+import functools
+import hashlib
 import re
 import sys
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
 
 from .utils import (
-    find_project_root,
-    get_project_boundary,
+    resolve_project_root,
+    read_json,
+    write_atomic,
+    write_json,
     Console
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorPattern:
     """A known error pattern and its fix."""
     pattern: str  # Regex pattern to match
@@ -40,9 +43,15 @@ class ErrorPattern:
     example: str = ""
     occurrences: int = 0
     last_seen: str = ""
+    compiled: Optional[re.Pattern] = field(default=None, repr=False, compare=False)
 
+    def __post_init__(self):
+        # Compile once so analyze_error never re-parses the pattern string
+        if self.compiled is None:
+            self.compiled = re.compile(self.pattern)
 
-@dataclass
+
+@dataclass(slots=True)
 class ErrorAnalysis:
     """Result of analyzing an error."""
     error_text: str
@@ -147,28 +156,204 @@ def get_lessons_path(root: Path) -> Path:
     return root / '.mcp' / 'lessons_learned.md'
 
 
+def get_lessons_index_path(root: Path) -> Path:
+    """Get path to the lessons dedupe index (one lesson hash per line)."""
+    return root / '.mcp' / 'lessons_learned.idx'
+
+
+LESSONS_HEADER = "# Lessons Learned\n\n> These are injected into every AI agent context\n\n"
+
+# Matches lines written by append_lessons: "- lesson (learned: 2024-01-01)"
+_LESSON_LINE = re.compile(r'^- (.+?) \((?:learned|auto): [^)]*\)$', re.MULTILINE)
+
+
+def _lesson_key(lesson: str) -> str:
+    """Hash a lesson for the dedupe index."""
+    return hashlib.sha1(lesson.encode('utf-8')).hexdigest()
+
+
+def load_lesson_index(root: Path) -> Set[str]:
+    """
+    Load the set of recorded lesson hashes.
+    
+    The index is rebuilt from lessons_learned.md if it is missing or
+    older than the lessons file (e.g. after a manual edit).
+    """
+    lessons_path = get_lessons_path(root)
+    index_path = get_lessons_index_path(root)
+    
+    try:
+        lessons_mtime = lessons_path.stat().st_mtime
+    except OSError:
+        return set()
+    
+    try:
+        if index_path.stat().st_mtime >= lessons_mtime:
+            return set(index_path.read_text(encoding='utf-8').split())
+    except OSError:
+        pass
+    
+    content = lessons_path.read_text(encoding='utf-8')
+    keys = {_lesson_key(m.group(1)) for m in _LESSON_LINE.finditer(content)}
+    save_lesson_index(keys, root)
+    return keys
+
+
+def save_lesson_index(keys: Set[str], root: Path):
+    """Save the set of recorded lesson hashes."""
+    write_atomic(get_lessons_index_path(root), '\n'.join(sorted(keys)))
+
+
+def append_lessons(lessons: List[str], root: Path, source: str = "learned") -> List[str]:
+    """
+    Append lessons to lessons_learned.md, skipping ones already recorded.
+    
+    Membership is checked against the hash index, and new lessons are
+    appended in a single write instead of rewriting the whole file.
+    
+    Returns:
+        The lessons that were added
+    """
+    keys = load_lesson_index(root)
+    
+    new_lessons = []
+    for lesson in lessons:
+        key = _lesson_key(lesson)
+        if key not in keys:
+            keys.add(key)
+            new_lessons.append(lesson)
+    
+    if not new_lessons:
+        return []
+    
+    lessons_path = get_lessons_path(root)
+    lessons_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    timestamp = datetime.now().strftime("%Y-%m-%d")
+    text = ''.join(f"- {lesson} ({source}: {timestamp})\n" for lesson in new_lessons)
+    if not lessons_path.exists():
+        text = LESSONS_HEADER + text
+    
+    with open(lessons_path, 'a', encoding='utf-8') as f:
+        f.write(text)
+    
+    save_lesson_index(keys, root)
+    return new_lessons
+
+
 def load_custom_patterns(root: Path) -> List[ErrorPattern]:
     """Load custom error patterns from project."""
     patterns_path = get_patterns_path(root)
     
     if patterns_path.exists():
         try:
-            with open(patterns_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return [ErrorPattern(**p) for p in data]
+            data = read_json(patterns_path)
+            return [ErrorPattern(**{k: v for k, v in p.items() if k != 'compiled'}) for p in data]
         except Exception:
             pass
     
     return []
 
 
+def _pattern_to_dict(pattern: ErrorPattern) -> dict:
+    """Serialize a pattern, leaving out the compiled regex."""
+    data = asdict(pattern)
+    data.pop('compiled', None)
+    return data
+
+
 def save_custom_patterns(patterns: List[ErrorPattern], root: Path):
     """Save custom error patterns."""
-    patterns_path = get_patterns_path(root)
-    patterns_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(get_patterns_path(root), [_pattern_to_dict(p) for p in patterns])
+
+
+# Exception type at the start of an error line, e.g. "KeyError: 'x'"
+_ERROR_TYPE = re.compile(r'(\w+Error)\s*:')
+
+# {match}, {match1}, {match2}, ... in a fix template
+_FIX_PLACEHOLDER = re.compile(r'\{match(\d*)\}')
+
+# Numbered or named backreference inside a pattern
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+@functools.lru_cache(maxsize=8)
+def _combined_regex(pattern_strings: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    Join patterns into one alternation with a named group per pattern.
+    
+    Returns None if the patterns cannot be combined (e.g. a custom
+    pattern uses inline flags or backreferences, whose group numbers the
+    wrapping groups would shift), in which case callers scan one by one.
+    """
+    if any(_BACKREFERENCE.search(p) for p in pattern_strings):
+        return None
+    try:
+        return re.compile('|'.join(
+            f'(?P<p{i}>{p})' for i, p in enumerate(pattern_strings)
+        ))
+    except re.error:
+        return None
+
+
+def match_patterns(patterns: List[ErrorPattern], text: str) -> Optional[Tuple[int, tuple]]:
+    """
+    Find the first pattern (in list order) that matches text.
+    
+    Uses a single combined regex pass over the text rather than one
+    search per pattern. The pass only reports non-overlapping matches, so
+    patterns before the one it found are then searched individually.
+    
+    Returns:
+        (pattern index, captured groups) or None if nothing matched
+    """
+    combined = _combined_regex(tuple(p.pattern for p in patterns))
     
-    with open(patterns_path, 'w', encoding='utf-8') as f:
-        json.dump([asdict(p) for p in patterns], f, indent=2)
+    if combined is None:
+        for i, pattern in enumerate(patterns):
+            match = pattern.compiled.search(text)
+            if match:
+                return i, match.groups()
+        return None
+    
+    # Lowest pattern index among the non-overlapping matches
+    best_index, best_match = None, None
+    for match in combined.finditer(text):
+        index = int(match.lastgroup[1:])
+        if best_index is None or index < best_index:
+            best_index, best_match = index, match
+            if index == 0:
+                break
+    
+    if best_match is None:
+        return None
+    
+    # An earlier pattern may only match inside a span the scan consumed
+    for i in range(best_index):
+        match = patterns[i].compiled.search(text)
+        if match:
+            return i, match.groups()
+    
+    start = combined.groupindex[best_match.lastgroup]
+    count = patterns[best_index].compiled.groups
+    return best_index, best_match.groups()[start:start + count]
+
+
+def render_fix(template: str, groups: tuple) -> str:
+    """
+    Fill a fix template with captured groups.
+    
+    {match} and {match1} are the first group, {match2} the second, and so
+    on. Placeholders without a matching group become empty; any other
+    braces are left as written.
+    """
+    def fill(match: re.Match) -> str:
+        index = int(match.group(1) or 1) - 1
+        if 0 <= index < len(groups):
+            return groups[index] or ""
+        return ""
+    
+    return _FIX_PLACEHOLDER.sub(fill, template)
 
 
 def analyze_error(error_text: str, root: Path = None) -> ErrorAnalysis:
@@ -177,36 +362,35 @@ def analyze_error(error_text: str, root: Path = None) -> ErrorAnalysis:
     
     Combines built-in patterns with project-specific learned patterns.
     """
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    root = root or resolve_project_root()
     
     # Combine built-in and custom patterns
     all_patterns = BUILTIN_PATTERNS + load_custom_patterns(root)
     
+    # Tracebacks end with the exception line, so try that before the whole text
+    last_line = error_text.rstrip().rsplit('\n', 1)[-1]
+    
     # Try to match patterns
-    for pattern in all_patterns:
-        match = re.search(pattern.pattern, error_text)
-        if match:
-            # Build fix with captured groups
-            fix = pattern.fix
-            for i, group in enumerate(match.groups()):
-                fix = fix.replace(f"{{match{i+1 if i > 0 else ''}}}", group)
-                fix = fix.replace(f"{{match}}", group)  # First group as default
-            
-            return ErrorAnalysis(
-                error_text=error_text,
-                category=pattern.category,
-                matched_pattern=pattern,
-                suggested_fix=fix,
-                confidence=0.8 if pattern in BUILTIN_PATTERNS else 0.9
-            )
+    found = match_patterns(all_patterns, last_line)
+    if not found and last_line != error_text:
+        found = match_patterns(all_patterns, error_text)
+    if found:
+        index, groups = found
+        pattern = all_patterns[index]
+        return ErrorAnalysis(
+            error_text=error_text,
+            category=pattern.category,
+            matched_pattern=pattern,
+            suggested_fix=render_fix(pattern.fix, groups),
+            confidence=0.8 if index < len(BUILTIN_PATTERNS) else 0.9
+        )
     
     # No pattern matched - generic analysis
     category = "Unknown"
-    if "Error:" in error_text:
-        # Try to extract error type
-        error_match = re.search(r'(\w+Error):', error_text)
-        if error_match:
-            category = error_match.group(1)
+    # Try to extract error type
+    error_match = _ERROR_TYPE.search(last_line) or _ERROR_TYPE.search(error_text)
+    if error_match:
+        category = error_match.group(1)
     
     return ErrorAnalysis(
         error_text=error_text,
@@ -219,25 +403,12 @@ def analyze_error(error_text: str, root: Path = None) -> ErrorAnalysis:
 
 def add_lesson(lesson: str, root: Path = None):
     """Add a lesson to lessons_learned.md."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
-    lessons_path = get_lessons_path(root)
-    lessons_path.parent.mkdir(parents=True, exist_ok=True)
+    root = root or resolve_project_root()
     
-    timestamp = datetime.now().strftime("%Y-%m-%d")
-    lesson_line = f"- {lesson} (learned: {timestamp})\n"
-    
-    # Load existing or create new
-    if lessons_path.exists():
-        content = lessons_path.read_text(encoding='utf-8')
-        if lesson in content:
-            Console.warn("Lesson already recorded")
-            return
-    else:
-        content = "# Lessons Learned\n\n> These are injected into every AI agent context\n\n"
+    if not append_lessons([lesson], root):
+        Console.warn("Lesson already recorded")
+        return
     
-    # Append lesson
-    content += lesson_line
-    lessons_path.write_text(content, encoding='utf-8')
     Console.ok(f"Learned: {lesson}")
 
 
@@ -273,7 +444,7 @@ def main():
     Console.header("Auto-Healing Error Analyzer")
     
     args = [a for a in sys.argv[1:] if not a.startswith('-')]
-    root = get_project_boundary() or find_project_root() or Path.cwd()
+    root = resolve_project_root()
     
     # Add lesson
     for i, arg in enumerate(sys.argv):
@@ -11,7 +11,6 @@ from pathlib import Path
 from typing import Any, Callable, Optional
 import functools
 import sys
-import traceback
 
 # Import learning system
 try:
@@ -37,7 +36,6 @@ def auto_learn(tool_name: str):
                 return result
             except Exception as e:
                 # Record failure
-                tb = traceback.format_exc()
                 record_error(
                     error_type=type(e).__name__,
                     pattern=str(e)[:100],
@@ -105,12 +103,34 @@ def get_success_rate(tool_name: str) -> float:
 # ENHANCED LEARNING: Commit, Test, and Behavioral Patterns
 # =============================================================================
 
-import json
+import atexit
+import heapq
 import re
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
+from typing import Dict, Set, Tuple
 
-from .utils import find_project_root, get_project_boundary, run_git_command, Console
+from .utils import resolve_project_root, run_git_command, read_json, write_json, Console
+from .auto_heal import append_lessons
+
+# Try numpy for bulk score updates
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Below this many scores the plain loop is faster than building arrays
+_VECTORIZE_MIN_SCORES = 1000
+
+
+# In-memory copy of enhanced learning data per file: path -> (mtime, data).
+# Deferred saves mark the path dirty until flush() writes it out.
+_CACHE: Dict[Path, Tuple[Optional[float], dict]] = {}
+_DIRTY: Set[Path] = set()
+
+# Last file recorded by record_file_access in this process, per root
+_LAST_ACCESSED: Dict[Path, str] = {}
 
 
 def _get_learning_path(root: Path) -> Path:
@@ -118,70 +138,169 @@ def _get_learning_path(root: Path) -> Path:
     return root / '.mcp' / 'enhanced_learning.json'
 
 
+def _get_mtime(path: Path) -> Optional[float]:
+    """Get file mtime, or None if the file does not exist."""
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
 def _load_enhanced_data(root: Path = None) -> dict:
-    """Load enhanced learning data."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    """Load enhanced learning data (cached until the file changes)."""
+    root = root or resolve_project_root()
     path = _get_learning_path(root)
     
-    if path.exists():
+    mtime = _get_mtime(path)
+    cached = _CACHE.get(path)
+    if cached and (path in _DIRTY or cached[0] == mtime):
+        return cached[1]
+    
+    data = None
+    if mtime is not None:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            data = read_json(path)
         except Exception:
             pass
     
-    return {
-        'effectiveness_scores': {},
-        'access_sequences': {},
-        'auto_lessons': [],
-        'success_patterns': [],
-        'failure_patterns': [],
-        'commits_learned': 0,
-        'tests_learned': 0,
-    }
+    if data is None:
+        data = {
+            'effectiveness_scores': {},
+            'access_trie': {},
+            'auto_lessons': [],
+            'success_patterns': [],
+            'failure_patterns': [],
+            'commits_learned': 0,
+            'tests_learned': 0,
+        }
+    
+    _migrate_access_sequences(data, root)
+    _bound_patterns(data)
+    _CACHE[path] = (mtime, data)
+    return data
 
 
-def _save_enhanced_data(data: dict, root: Path = None):
-    """Save enhanced learning data."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+# History kept for each pattern list (oldest entries drop off first)
+_PATTERN_LIMITS = {'success_patterns': 100, 'failure_patterns': 50}
+
+
+def _bound_patterns(data: dict):
+    """Hold pattern histories in bounded deques so appends never need trimming."""
+    for key, limit in _PATTERN_LIMITS.items():
+        data[key] = deque(data.get(key, []), maxlen=limit)
+
+
+def _path_parts(file_path: str, root: Path) -> Tuple[str, ...]:
+    """Split a file path into trie segments, relative to root when inside it."""
+    path = Path(file_path)
+    if path.is_absolute():
+        try:
+            return path.relative_to(root).parts
+        except ValueError:
+            pass
+    return path.parts
+
+
+def _access_node(trie: dict, file_path: str, root: Path, create: bool = False) -> Optional[dict]:
+    """
+    Find the trie node for a file in the access-sequence trie.
+    
+    The trie is keyed by path segment, so files under a common directory
+    share the prefix nodes. Each node holds the scores of files accessed
+    next in '_next' and its sub-segments in 'children'.
+    """
+    node = None
+    children = trie
+    for part in _path_parts(file_path, root):
+        node = children.get(part)
+        if node is None:
+            if not create:
+                return None
+            node = children[part] = {'_next': {}, 'children': {}}
+        children = node['children']
+    return node
+
+
+def _migrate_access_sequences(data: dict, root: Path):
+    """Convert the old flat access_sequences mapping into the access trie."""
+    sequences = data.pop('access_sequences', None)
+    trie = data.setdefault('access_trie', {})
+    for last, following in (sequences or {}).items():
+        _access_node(trie, last, root, create=True)['_next'].update(following)
+
+
+def _save_enhanced_data(data: dict, root: Path = None, defer: bool = False):
+    """
+    Save enhanced learning data.
+    
+    With defer=True the data is only updated in memory and written out
+    by the next flush().
+    """
+    root = root or resolve_project_root()
     path = _get_learning_path(root)
-    path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    if defer:
+        _CACHE[path] = (_CACHE.get(path, (None, None))[0], data)
+        _DIRTY.add(path)
+        return
+    
+    _write_enhanced_data(path, data)
+
+
+def _write_enhanced_data(path: Path, data: dict):
+    """Write enhanced learning data to disk and refresh the cache."""
+    write_json(path, {k: list(v) if isinstance(v, deque) else v for k, v in data.items()})
+    _CACHE[path] = (_get_mtime(path), data)
+    _DIRTY.discard(path)
+
+
+def flush():
+    """Write out any enhanced learning data saved with defer=True."""
+    for path in list(_DIRTY):
+        _write_enhanced_data(path, _CACHE[path][1])
+
+
+atexit.register(flush)
 
 
 # Lesson extraction patterns
 LESSON_PATTERNS = [
-    (r'fix[:\s]+use\s+(\w+)\s+instead\s+of\s+(\w+)', 'Use {0} instead of {1}'),
-    (r"fix[:\s]+(?:don'?t|do\s+not)\s+(.+)", 'Do not {0}'),
-    (r'fix[:\s]+always\s+(.+)', 'Always {0}'),
-    (r'fix[:\s]+never\s+(.+)', 'Never {0}'),
-    (r'revert[:\s]+"?(.+)"?', 'Reverted: {0}'),
+    (re.compile(r'fix[:\s]+use\s+(\w+)\s+instead\s+of\s+(\w+)'), 'Use {0} instead of {1}'),
+    (re.compile(r"fix[:\s]+(?:don'?t|do\s+not)\s+(.+)"), 'Do not {0}'),
+    (re.compile(r'fix[:\s]+always\s+(.+)'), 'Always {0}'),
+    (re.compile(r'fix[:\s]+never\s+(.+)'), 'Never {0}'),
+    (re.compile(r'revert[:\s]+"?(.+)"?'), 'Reverted: {0}'),
 ]
 
 
 def learn_from_commit(root: Path = None) -> int:
     """Learn lessons from the most recent commit."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    root = root or resolve_project_root()
     data = _load_enhanced_data(root)
     
-    message = run_git_command(['log', '-1', '--format=%s'], cwd=root)
+    # Subject and changed files in one git call: "subject\n\nfile1\nfile2..."
+    output = run_git_command(['log', '-1', '--format=%s', '--name-only', 'HEAD'], cwd=root)
+    if not output:
+        return 0
+    
+    message, _, files_output = output.partition('\n')
     if not message:
         return 0
     
-    files_output = run_git_command(['diff-tree', '--no-commit-id', '--name-only', '-r', 'HEAD'], cwd=root)
-    changed_files = [f for f in (files_output or '').strip().split('\n') if f.endswith('.py')]
+    changed_files = [f for f in files_output.strip().split('\n') if f.endswith('.py')]
     
     lessons_learned = 0
+    known_lessons = set(data['auto_lessons'])
     
     # Extract lessons from commit message
+    message_lower = message.lower()
     for pattern, template in LESSON_PATTERNS:
-        match = re.search(pattern, message.lower())
+        match = pattern.search(message_lower)
         if match:
             lesson = template.format(*match.groups())
             lesson = lesson[0].upper() + lesson[1:]
-            if lesson not in data['auto_lessons']:
+            if lesson not in known_lessons:
+                known_lessons.add(lesson)
                 data['auto_lessons'].append(lesson)
                 lessons_learned += 1
                 Console.ok(f"Learned: {lesson}")
@@ -197,7 +316,6 @@ def learn_from_commit(root: Path = None) -> int:
             data['effectiveness_scores'][f] = min(1.0, current + 0.05)
     
     data['commits_learned'] = data.get('commits_learned', 0) + 1
-    data['success_patterns'] = data['success_patterns'][-100:]
     
     _save_enhanced_data(data, root)
     
@@ -210,28 +328,20 @@ def learn_from_commit(root: Path = None) -> int:
 
 def _append_lessons(lessons: list, root: Path):
     """Append lessons to lessons_learned.md."""
-    lessons_path = root / '.mcp' / 'lessons_learned.md'
-    lessons_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    timestamp = datetime.now().strftime("%Y-%m-%d")
-    
-    content = lessons_path.read_text(encoding='utf-8') if lessons_path.exists() else "# Lessons Learned\n\n"
-    
-    for lesson in lessons:
-        if lesson not in content:
-            content += f"- {lesson} (auto: {timestamp})\n"
-    
-    lessons_path.write_text(content, encoding='utf-8')
+    append_lessons(lessons, root, source="auto")
 
 
 def learn_from_test(exit_code: int, root: Path = None):
     """Learn from test result (0=pass, non-zero=fail)."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    root = root or resolve_project_root()
     data = _load_enhanced_data(root)
     
-    files_output = run_git_command(['diff', '--name-only'], cwd=root) or ''
-    staged_output = run_git_command(['diff', '--cached', '--name-only'], cwd=root) or ''
-    changed_files = list(set(f for f in (files_output + staged_output).split('\n') if f.endswith('.py')))
+    # Working tree and index changes against HEAD in one call; a repo
+    # without commits yet only has staged changes
+    files_output = run_git_command(['diff', 'HEAD', '--name-only'], cwd=root)
+    if files_output is None:
+        files_output = run_git_command(['diff', '--cached', '--name-only'], cwd=root)
+    changed_files = list(set(f for f in (files_output or '').split('\n') if f.endswith('.py')))
     
     if exit_code == 0:
         Console.ok("Test passed - boosting effectiveness")
@@ -246,65 +356,105 @@ def learn_from_test(exit_code: int, root: Path = None):
             data['effectiveness_scores'][f] = max(0.1, current - 0.1)
     
     data['tests_learned'] = data.get('tests_learned', 0) + 1
-    data['failure_patterns'] = data['failure_patterns'][-50:]
     
     _save_enhanced_data(data, root)
 
 
 def record_file_access(file_path: str, root: Path = None):
     """Record file access for behavioral pattern learning."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
-    data = _load_enhanced_data(root)
+    record_file_accesses([file_path], root)
+
+
+def record_file_accesses(file_paths: list, root: Path = None, defer: bool = True):
+    """
+    Record a sequence of file accesses in order.
     
+    The learning data is loaded once and saved once for the whole batch.
+    With defer=True the save waits for flush().
+    """
+    root = root or resolve_project_root()
     recent_key = '_last_accessed'
-    last = data.get(recent_key, '')
+    data = None
+    changed = False
     
-    if last and last != file_path:
-        if last not in data['access_sequences']:
-            data['access_sequences'][last] = {}
-        current = data['access_sequences'][last].get(file_path, 0.0)
-        data['access_sequences'][last][file_path] = min(1.0, current + 0.1)
+    for file_path in file_paths:
+        # Re-accessing the same file changes nothing; skip loading the data
+        if _LAST_ACCESSED.get(root) == file_path:
+            continue
+        
+        if data is None:
+            data = _load_enhanced_data(root)
+        
+        last = data.get(recent_key, '')
+        _LAST_ACCESSED[root] = file_path
+        
+        if last == file_path:
+            continue
+        
+        if last:
+            following = _access_node(data['access_trie'], last, root, create=True)['_next']
+            following[file_path] = min(1.0, following.get(file_path, 0.0) + 0.1)
+        
+        data[recent_key] = file_path
+        changed = True
     
-    data[recent_key] = file_path
-    _save_enhanced_data(data, root)
+    if changed:
+        _save_enhanced_data(data, root, defer=defer)
 
 
 def predict_next_files(current_file: str, root: Path = None, limit: int = 5) -> list:
     """Predict next likely files based on access patterns."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    root = root or resolve_project_root()
     data = _load_enhanced_data(root)
     
-    sequences = data.get('access_sequences', {}).get(current_file, {})
-    predictions = sorted(sequences.items(), key=lambda x: x[1], reverse=True)
-    return predictions[:limit]
+    node = _access_node(data.get('access_trie', {}), current_file, root)
+    if not node:
+        return []
+    return heapq.nlargest(limit, node['_next'].items(), key=lambda x: x[1])
 
 
 def get_effectiveness_score(file_path: str, root: Path = None) -> float:
     """Get effectiveness score for a file."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    root = root or resolve_project_root()
     data = _load_enhanced_data(root)
     return data.get('effectiveness_scores', {}).get(file_path, 0.5)
 
 
+def _decay_scores(scores: dict, step: float = 0.02) -> dict:
+    """Move every effectiveness score one step toward neutral (0.5)."""
+    if NUMPY_AVAILABLE and len(scores) >= _VECTORIZE_MIN_SCORES:
+        values = np.fromiter(scores.values(), dtype=float, count=len(scores))
+        values = np.where(
+            values > 0.5,
+            np.maximum(0.5, values - step),
+            np.minimum(0.5, values + step)
+        )
+        return dict(zip(scores.keys(), values.tolist()))
+    
+    for f, current in scores.items():
+        if current > 0.5:
+            scores[f] = max(0.5, current - step)
+        elif current < 0.5:
+            scores[f] = min(0.5, current + step)
+    return scores
+
+
 def consolidate_session(root: Path = None):
     """End-of-session consolidation - decay old scores, prune data."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    root = root or resolve_project_root()
     data = _load_enhanced_data(root)
     
     Console.info("Consolidating learning session...")
     
     # Decay effectiveness toward neutral
-    for f in list(data.get('effectiveness_scores', {}).keys()):
-        current = data['effectiveness_scores'][f]
-        if current > 0.5:
-            data['effectiveness_scores'][f] = max(0.5, current - 0.02)
-        elif current < 0.5:
-            data['effectiveness_scores'][f] = min(0.5, current + 0.02)
+    if 'effectiveness_scores' in data:
+        data['effectiveness_scores'] = _decay_scores(data['effectiveness_scores'])
     
     # Prune old patterns
     cutoff = (datetime.utcnow() - timedelta(days=30)).isoformat() + 'Z'
     data['success_patterns'] = [p for p in data.get('success_patterns', []) if p.get('timestamp', '') > cutoff]
     data['failure_patterns'] = [p for p in data.get('failure_patterns', []) if p.get('timestamp', '') > cutoff]
+    _bound_patterns(data)
     
     _save_enhanced_data(data, root)
     Console.ok("Session consolidated")
@@ -315,7 +465,7 @@ def main():
     from .utils import Console
     Console.header("Auto-Learning System")
     
-    root = get_project_boundary() or find_project_root() or Path.cwd()
+    root = resolve_project_root()
     
     # Enhanced CLI options
     if '--from-commit' in sys.argv:
@@ -327,9 +477,8 @@ def main():
         # Record staged files for pattern learning
         Console.info("Recording pre-commit patterns...")
         files_output = run_git_command(['diff', '--cached', '--name-only'], cwd=root) or ''
-        for f in files_output.strip().split('\n'):
-            if f.endswith('.py'):
-                record_file_access(str(root / f), root)
+        staged = [str(root / f) for f in files_output.strip().split('\n') if f.endswith('.py')]
+        record_file_accesses(staged, root, defer=False)
         Console.ok("Pre-commit patterns recorded")
         return 0
     
@@ -8,32 +8,61 @@ Usage:
     python mcp.py context --recent    # Context from recent files
 """
 
-from collections import Counter
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field, asdict
-from datetime import datetime
+from itertools import islice
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-import json
+import ast
+import atexit
+import functools
+import heapq
 import os
 import sys
+import time
 
-from .utils import Console, find_project_root, get_project_boundary
+from .context import estimate_tokens
+from .utils import Console, find_python_files, resolve_project_root, json_dumps, read_json, write_atomic
+
+
+# In-memory caches per cache file: path -> (mtime, cache). Deferred saves
+# mark the path dirty; it is written once _FLUSH_INTERVAL has passed since
+# the last write, or at exit.
+_CACHES: Dict[Path, Tuple[Optional[float], 'ContextCache']] = {}
+_DIRTY: set = set()
+_LAST_FLUSH: Dict[Path, float] = {}
+_FLUSH_INTERVAL = 1.0  # seconds
+
+
+# Number of recently accessed files remembered in the cache
+MAX_RECENT_FILES = 20
 
 
 @dataclass
 class ContextCache:
     """Cache of context state."""
-    recent_files: List[str] = field(default_factory=list)
+    # Most recent first; an OrderedDict (values unused) so re-accessing a
+    # file moves it to the front in O(1). Stored as a list on disk.
+    recent_files: 'OrderedDict[str, None]' = field(default_factory=OrderedDict)
     hot_files: Dict[str, int] = field(default_factory=dict)  # path -> access count
     last_query: str = ""
     last_task: str = ""
-    timestamp: str = ""
+    timestamp: int = 0  # last write, time.time_ns()
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        data = asdict(self)
+        data['recent_files'] = list(self.recent_files)
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> 'ContextCache':
+        data = dict(data)
+        if not isinstance(data.get('timestamp'), int):
+            data['timestamp'] = 0  # older caches stored an ISO string
+        data['recent_files'] = OrderedDict.fromkeys(
+            islice(data.get('recent_files', []), MAX_RECENT_FILES)
+        )
         return cls(**data)
 
 
@@ -47,34 +76,74 @@ class ContextResult:
 
 def get_cache_path(root: Path = None) -> Path:
     """Get path to context cache."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    root = root or resolve_project_root()
     return root / '.mcp' / 'memory' / 'context_cache.json'
 
 
+def _get_mtime(path: Path) -> Optional[float]:
+    """Get file mtime, or None if the file does not exist."""
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
 def load_cache(root: Path = None) -> ContextCache:
-    """Load context cache from disk."""
+    """Load context cache (kept in memory until the file changes)."""
     cache_path = get_cache_path(root)
 
-    if cache_path.exists():
+    mtime = _get_mtime(cache_path)
+    cached = _CACHES.get(cache_path)
+    if cached and (cache_path in _DIRTY or cached[0] == mtime):
+        return cached[1]
+
+    cache = None
+    if mtime is not None:
         try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return ContextCache.from_dict(data)
+            cache = ContextCache.from_dict(read_json(cache_path))
         except Exception:
             pass
 
-    return ContextCache()
+    cache = cache or ContextCache()
+    _CACHES[cache_path] = (mtime, cache)
+    return cache
 
 
-def save_cache(cache: ContextCache, root: Path = None):
-    """Save context cache to disk."""
+def save_cache(cache: ContextCache, root: Path = None, defer: bool = False):
+    """
+    Save context cache to disk.
+
+    With defer=True the write is skipped if the cache was flushed less
+    than _FLUSH_INTERVAL seconds ago; pending changes are written by the
+    next save or by flush_cache() at exit.
+    """
     cache_path = get_cache_path(root)
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
 
-    cache.timestamp = datetime.utcnow().isoformat() + 'Z'
+    if defer and time.monotonic() - _LAST_FLUSH.get(cache_path, 0.0) < _FLUSH_INTERVAL:
+        _CACHES[cache_path] = (_CACHES.get(cache_path, (None, None))[0], cache)
+        _DIRTY.add(cache_path)
+        return
 
-    with open(cache_path, 'w', encoding='utf-8') as f:
-        json.dump(cache.to_dict(), f, indent=2)
+    _write_cache(cache_path, cache)
+
+
+def _write_cache(cache_path: Path, cache: ContextCache):
+    """Write the cache atomically and refresh the in-memory copy."""
+    cache.timestamp = time.time_ns()
+    write_atomic(cache_path, json_dumps(cache.to_dict(), indent=True))
+
+    _CACHES[cache_path] = (_get_mtime(cache_path), cache)
+    _DIRTY.discard(cache_path)
+    _LAST_FLUSH[cache_path] = time.monotonic()
+
+
+def flush_cache():
+    """Write out cache changes held back by deferred saves."""
+    for cache_path in list(_DIRTY):
+        _write_cache(cache_path, _CACHES[cache_path][1])
+
+
+atexit.register(flush_cache)
 
 
 def track_file_access(path: Path, root: Path = None):
@@ -84,15 +153,95 @@ def track_file_access(path: Path, root: Path = None):
     path_str = str(path)
 
     # Update recent files (max 20)
-    if path_str in cache.recent_files:
-        cache.recent_files.remove(path_str)
-    cache.recent_files.insert(0, path_str)
-    cache.recent_files = cache.recent_files[:20]
+    recent = cache.recent_files
+    recent[path_str] = None
+    recent.move_to_end(path_str, last=False)
+    while len(recent) > MAX_RECENT_FILES:
+        recent.popitem(last=True)
 
     # Update hot files
     cache.hot_files[path_str] = cache.hot_files.get(path_str, 0) + 1
 
-    save_cache(cache, root)
+    save_cache(cache, root, defer=True)
+
+
+def _resolve_paths(file_paths, root: Path) -> List[Path]:
+    """Turn cached path strings into absolute paths under root."""
+    paths = []
+    for file_path in file_paths:
+        path = Path(file_path)
+        if not path.is_absolute():
+            path = root / path
+        paths.append(path)
+    return paths
+
+
+def _dir_entries(parent: str) -> frozenset:
+    """Names in a directory (one scandir call); empty if it can't be listed."""
+    try:
+        with os.scandir(parent) as entries:
+            return frozenset(entry.name for entry in entries)
+    except OSError:
+        return frozenset()
+
+
+def _existing_paths(paths: List[Path]) -> List[Path]:
+    """
+    Keep only paths that exist, in order.
+
+    Lists each parent directory once instead of stat-ing every path. The
+    listings are only reused within one call, so they are never stale.
+    """
+    listings: Dict[str, frozenset] = {}
+    existing = []
+    for path in paths:
+        parent = str(path.parent)
+        if parent not in listings:
+            listings[parent] = _dir_entries(parent)
+        if path.name in listings[parent]:
+            existing.append(path)
+    return existing
+
+
+def _read_head(path: Path, max_lines: int) -> Optional[Tuple[str, str]]:
+    """Read the first max_lines lines of a file; None if unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = list(islice(f, max_lines))
+        return str(path), ''.join(lines)
+    except Exception:
+        return None
+
+
+def _read_heads(paths: List[Path], max_lines: int) -> List[Tuple[str, str]]:
+    """Read file heads concurrently, keeping input order and skipping failures."""
+    paths = _existing_paths(paths)
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(paths), 8)) as executor:
+        results = executor.map(lambda p: _read_head(p, max_lines), paths)
+        return [r for r in results if r]
+
+
+def _read_snippet(path: Path, max_chars: int) -> Optional[str]:
+    """
+    Read the first max_chars characters of a file, or None if it is missing.
+
+    Cached by (path, mtime), so a file pulled into several context layers
+    is only read once while it stays unchanged.
+    """
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _read_snippet_cached(str(path), mtime_ns, max_chars)
+
+
+@functools.lru_cache(maxsize=256)
+def _read_snippet_cached(path_str: str, mtime_ns: int, max_chars: int) -> str:
+    """Cached worker for _read_snippet; reads only max_chars, not the whole file."""
+    with open(path_str, encoding='utf-8') as f:
+        return f.read(max_chars)
 
 
 def get_recent_context(
@@ -102,25 +251,11 @@ def get_recent_context(
 ) -> ContextResult:
     """Get context from recently accessed files."""
     cache = load_cache(root)
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
-
-    files = []
-    token_count = 0
+    root = root or resolve_project_root()
 
-    for file_path in cache.recent_files[:limit]:
-        path = Path(file_path)
-        if not path.is_absolute():
-            path = root / path
-
-        if path.exists():
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()[:max_lines]
-                    content = ''.join(lines)
-                    files.append((str(path), content))
-                    token_count += len(content.split())
-            except Exception:
-                pass
+    paths = _resolve_paths(islice(cache.recent_files, limit), root)
+    files = _read_heads(paths, max_lines)
+    token_count = sum(estimate_tokens(content) for _, content in files)
 
     return ContextResult(files=files, token_count=token_count, source='recent')
 
@@ -132,30 +267,44 @@ def get_hot_context(
 ) -> ContextResult:
     """Get context from most frequently accessed files."""
     cache = load_cache(root)
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    root = root or resolve_project_root()
 
-    # Sort by access count
-    sorted_files = sorted(cache.hot_files.items(), key=lambda x: x[1], reverse=True)
+    # Most accessed first
+    top_files = heapq.nlargest(limit, cache.hot_files.items(), key=lambda x: x[1])
 
-    files = []
-    token_count = 0
+    paths = _resolve_paths((file_path for file_path, _ in top_files), root)
+    files = _read_heads(paths, max_lines)
+    token_count = sum(estimate_tokens(content) for _, content in files)
 
-    for file_path, _ in sorted_files[:limit]:
-        path = Path(file_path)
-        if not path.is_absolute():
-            path = root / path
+    return ContextResult(files=files, token_count=token_count, source='hot')
 
-        if path.exists():
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()[:max_lines]
-                    content = ''.join(lines)
-                    files.append((str(path), content))
-                    token_count += len(content.split())
-            except Exception:
-                pass
 
-    return ContextResult(files=files, token_count=token_count, source='hot')
+def _semantic_search(query: str, limit: int, root: Path) -> Tuple[Tuple[str, str], ...]:
+    """
+    Search the vector index, reusing results for repeated queries.
+
+    Results are cached per (query, limit, root), and invalidated when the
+    index's embeddings file changes, so the same task string used by
+    several context layers only loads the index and searches once.
+    """
+    emb_file = root / '.mcp' / 'vector_index' / 'embeddings.json'
+    try:
+        index_mtime_ns = emb_file.stat().st_mtime_ns
+    except OSError:
+        index_mtime_ns = 0
+    return _cached_semantic(query, limit, str(root), index_mtime_ns)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_semantic(query: str, k: int, root_str: str, index_mtime_ns: int) -> Tuple[Tuple[str, str], ...]:
+    """Cached worker for _semantic_search: (path, content) per hit."""
+    from .vector_store import VectorStore
+    store = VectorStore(Path(root_str) / '.mcp' / 'vector_index')
+
+    if not store.load():
+        return ()
+
+    return tuple((r.chunk.path, r.chunk.content) for r in store.search(query, k=k))
 
 
 def get_semantic_context(
@@ -164,60 +313,97 @@ def get_semantic_context(
     root: Path = None
 ) -> ContextResult:
     """Get context via semantic search."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    root = root or resolve_project_root()
 
     files = []
     token_count = 0
 
     try:
-        from .vector_store import VectorStore
-        store = VectorStore(root / '.mcp' / 'vector_index')
-
-        if store.load():
-            results = store.search(query, k=limit)
-
-            for result in results:
-                files.append((result.chunk.path, result.chunk.content))
-                token_count += len(result.chunk.content.split())
+        for path, content in _semantic_search(query, limit, root):
+            files.append((path, content))
+            token_count += estimate_tokens(content)
     except Exception:
         pass
 
     # Update cache with query
     cache = load_cache(root)
     cache.last_query = query
-    save_cache(cache, root)
+    save_cache(cache, root, defer=True)
 
     return ContextResult(files=files, token_count=token_count, source='semantic')
 
 
+def _module_imports(path: Path) -> Tuple[str, ...]:
+    """
+    Get the dotted module names a Python file imports, in source order.
+
+    Parsed once with ast and cached by (path, mtime).
+    """
+    return _module_imports_cached(str(path), path.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=256)
+def _module_imports_cached(path_str: str, mtime_ns: int) -> Tuple[str, ...]:
+    """Cached worker for _module_imports."""
+    tree = ast.parse(Path(path_str).read_text(encoding='utf-8'), filename=path_str)
+
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            if node.module:
+                names.append(node.module)
+        elif isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+
+    return tuple(dict.fromkeys(names))
+
+
+@functools.lru_cache(maxsize=4)
+def _module_index(root_str: str, root_mtime_ns: int) -> Dict[str, Path]:
+    """
+    Map dotted module names to their .py files under root.
+
+    Built with one walk of the tree, so resolving an import is a dict
+    lookup instead of a stat per candidate path. The root's mtime is part
+    of the cache key so adding or removing top-level entries forces a
+    fresh walk.
+    """
+    root = Path(root_str)
+    index = {}
+    for path in find_python_files(root):
+        module = '.'.join(path.relative_to(root).with_suffix('').parts)
+        index[module] = path
+    return index
+
+
 def get_dependency_context(
     file_path: Path,
     root: Path = None
 ) -> ContextResult:
     """Get context from file dependencies (imports)."""
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+    root = root or resolve_project_root()
 
     files = []
     token_count = 0
 
     try:
-        from .treesitter_utils import parse_file
-        parsed = parse_file(file_path)
+        module_index = _module_index(str(root), os.stat(root).st_mtime_ns)
 
-        for imp in parsed.imports:
+        for imp in _module_imports(Path(file_path)):
             # Try to resolve import to file
-            parts = imp.replace('from ', '').replace('import ', '').split()[0].split('.')
+            parts = imp.split('.')
 
             for i in range(len(parts), 0, -1):
-                possible_path = root / '/'.join(parts[:i]) + '.py'
-                if possible_path.exists():
-                    try:
-                        with open(possible_path, 'r', encoding='utf-8') as f:
-                            content = f.read()[:2000]
-                            files.append((str(possible_path), content))
-                            token_count += len(content.split())
-                    except Exception:
-                        pass
+                possible_path = module_index.get('.'.join(parts[:i]))
+                if possible_path is None:
+                    continue
+                try:
+                    content = _read_snippet(possible_path, 2000)
+                except Exception:
+                    break  # Exists but unreadable
+                if content is not None:
+                    files.append((str(possible_path), content))
+                    token_count += estimate_tokens(content)
                     break
     except Exception:
         pass
@@ -242,107 +428,156 @@ def get_project_map(root: Path, budget: int) -> str:
             pass
     return ""
 
-def get_auto_context(
-    task: str = "",
-    token_budget: int = 8000, # Increased default for deep context
-    root: Path = None
-) -> str:
-    """
-    Get hierarchically layered context for AI agent.
-    
-    Implements 3-Tier Context Strategy:
-    - Tier 1 (Warm): State + Lessons - ALWAYS included, never skipped
-    - Tier 2 (Structure): Skeleton overview + Graph relationships
-    - Tier 3 (Active): Recent files + Dependencies + Semantic results
-    """
-    root = root or get_project_boundary() or find_project_root() or Path.cwd()
+# Share of the token budget per layer (3-Tier Strategy)
+_BUDGET_SHARES = (
+    0.10,  # warm: state + lessons (ALWAYS)
+    0.15,  # skeleton: codebase structure
+    0.15,  # graph: related files from graph
+    0.30,  # active: recent + dependencies
+    0.30,  # semantic: search results
+)
+DEFAULT_TOKEN_BUDGET = 8000  # Increased default for deep context
 
-    # Budget Allocation (3-Tier Strategy)
-    budget_warm = int(token_budget * 0.10)      # State + lessons (ALWAYS)
-    budget_skeleton = int(token_budget * 0.15)  # Codebase structure
-    budget_graph = int(token_budget * 0.15)     # Related files from graph
-    budget_active = int(token_budget * 0.30)    # Recent + dependencies
-    budget_semantic = int(token_budget * 0.30)  # Search results
 
-    layers = []
-    
-    # =========================================================================
-    # TIER 1: WARM CONTEXT (Always Injected - Project Consciousness)
-    # =========================================================================
-    warm_context = []
-    
-    # 1a. Project State (Goal, Current Task, Next Steps)
+def _split_budget(token_budget: int) -> Tuple[int, ...]:
+    """Split a token budget into (warm, skeleton, graph, active, semantic)."""
+    return tuple(int(token_budget * share) for share in _BUDGET_SHARES)
+
+
+_DEFAULT_BUDGETS = _split_budget(DEFAULT_TOKEN_BUDGET)
+
+
+def _state_layer(root: Path, max_tokens: int) -> Optional[str]:
+    """1a. Project State (Goal, Current Task, Next Steps)."""
     try:
         from .project_state import load_state, get_warm_context as get_state_context
         state = load_state(root)
-        state_context = get_state_context(state, max_tokens=budget_warm // 2)
-        if state_context:
-            warm_context.append(state_context)
+        return get_state_context(state, max_tokens=max_tokens) or None
     except Exception:
-        pass
-    
-    # 1b. Lessons Learned (Critical - Never Repeat Mistakes)
+        return None
+
+
+def _lessons_layer(root: Path, max_chars: int) -> Optional[str]:
+    """1b. Lessons Learned (Critical - Never Repeat Mistakes)."""
     try:
         lessons_file = root / '.mcp' / 'lessons_learned.md'
-        if lessons_file.exists():
-            lessons = lessons_file.read_text(encoding='utf-8')[:budget_warm * 2]  # ~chars
-            if lessons.strip():
-                warm_context.append("## Lessons Learned (CRITICAL)\n" + lessons)
+        with open(lessons_file, encoding='utf-8') as f:
+            lessons = f.read(max_chars)  # the file grows; never read past the budget
+        if lessons and not lessons.isspace():
+            return "## Lessons Learned (CRITICAL)\n" + lessons
     except Exception:
         pass
-    
-    # 1c. Memory/Decisions
+    return None
+
+
+def _memory_layer(task: str) -> Optional[str]:
+    """1c. Memory/Decisions."""
     try:
         from .memory import get_store
         store = get_store()
         recent_mems = store.recall(task) if task else store.list_all()
         recent_mems.sort(key=lambda m: m.updated or m.created, reverse=True)
-        
+
         mem_lines = []
         for mem in recent_mems[:5]:
             mem_lines.append(f"- [{mem.key}] {mem.value}")
         if mem_lines:
-            warm_context.append("## Remembered\n" + "\n".join(mem_lines))
+            return "## Remembered\n" + "\n".join(mem_lines)
+    except Exception:
+        pass
+    return None
+
+
+def _skeleton_layer(root: Path, max_tokens: int) -> Optional[str]:
+    """2a. Codebase Skeleton (Compressed Overview)."""
+    try:
+        from .skeleton import get_skeleton_for_context
+        return get_skeleton_for_context(root, max_tokens=max_tokens) or None
+    except Exception:
+        return None
+
+
+def _graph_layer(root: Path, task: str) -> Tuple[Optional[str], List[str]]:
+    """2b. Call Graph (Related Files for Task); returns (layer, files)."""
+    try:
+        from .call_graph import load_call_graph, query_graph
+        graph = load_call_graph(root)
+        if graph:
+            # Extract key terms from task (deduped, first-seen order)
+            task_terms = dict.fromkeys(t.lower() for t in task.split() if len(t) > 3)
+            related = set()
+
+            for term in islice(task_terms, 3):
+                result = query_graph(graph, term)
+                related.update(result.get('related_files', []))
+                if len(related) >= 5:
+                    break  # Only 5 files are used
+
+            if related:
+                graph_files = list(related)[:5]
+                layer = "## Related Files (from Graph)\n" + "\n".join(f"- `{f}`" for f in graph_files)
+                return layer, graph_files
     except Exception:
         pass
+    return None, []
+
+
+def get_auto_context(
+    task: str = "",
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    root: Path = None
+) -> str:
+    """
+    Get hierarchically layered context for AI agent.
     
+    Implements 3-Tier Context Strategy:
+    - Tier 1 (Warm): State + Lessons - ALWAYS included, never skipped
+    - Tier 2 (Structure): Skeleton overview + Graph relationships
+    - Tier 3 (Active): Recent files + Dependencies + Semantic results
+    """
+    root = root or resolve_project_root()
+
+    # Budget Allocation (3-Tier Strategy)
+    if token_budget == DEFAULT_TOKEN_BUDGET:
+        budgets = _DEFAULT_BUDGETS
+    else:
+        budgets = _split_budget(token_budget)
+    budget_warm, budget_skeleton, budget_graph, budget_active, budget_semantic = budgets
+
+    # Tier 1 and Tier 2 sources are independent and mostly disk-bound, so
+    # gather them concurrently and assemble in the original order.
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        warm_futures = [
+            executor.submit(_state_layer, root, budget_warm // 2),
+            executor.submit(_lessons_layer, root, budget_warm * 2),
+            executor.submit(_memory_layer, task),
+        ]
+        skeleton_future = executor.submit(_skeleton_layer, root, budget_skeleton)
+        graph_future = executor.submit(_graph_layer, root, task) if task else None
+
+    layers = []
+
+    # =========================================================================
+    # TIER 1: WARM CONTEXT (Always Injected - Project Consciousness)
+    # =========================================================================
+    warm_context = [f.result() for f in warm_futures]
+    warm_context = [c for c in warm_context if c]
     if warm_context:
         layers.append("# Project Context (Warm - Always Present)\n" + "\n\n".join(warm_context))
-    
+
     # =========================================================================
     # TIER 2: STRUCTURE (Skeleton + Graph)
     # =========================================================================
-    
-    # 2a. Codebase Skeleton (Compressed Overview)
-    try:
-        from .skeleton import get_skeleton_for_context
-        skeleton = get_skeleton_for_context(root, max_tokens=budget_skeleton)
-        if skeleton:
-            layers.append(skeleton)
-    except Exception:
-        pass
-    
-    # 2b. Call Graph (Related Files for Task)
+    skeleton = skeleton_future.result()
+    if skeleton:
+        layers.append(skeleton)
+
     graph_files = []
-    if task:
-        try:
-            from .call_graph import load_call_graph, query_graph
-            graph = load_call_graph(root)
-            if graph:
-                # Extract key terms from task
-                task_terms = [t.lower() for t in task.split() if len(t) > 3]
-                related = set()
-                
-                for term in task_terms[:3]:
-                    result = query_graph(graph, term)
-                    related.update(result.get('related_files', []))
-                
-                if related:
-                    graph_files = list(related)[:5]
-                    layers.append("## Related Files (from Graph)\n" + "\n".join(f"- `{f}`" for f in graph_files))
-        except Exception:
-            pass
-    
+    if graph_future:
+        graph_layer, graph_files = graph_future.result()
+        if graph_layer:
+            layers.append(graph_layer)
+
     # =========================================================================
     # TIER 3: ACTIVE CONTEXT (Files + Semantic)
     # =========================================================================
@@ -354,35 +589,46 @@ def get_auto_context(
     for path, content in recent.files:
         if active_tokens < budget_active:
             active_files[path] = content[:2000]
-            active_tokens += len(content.split())
+            active_tokens += estimate_tokens(content)
 
     # 3b. Graph-Related Files (load content if budget allows)
-    for gf in graph_files:
+    graph_paths = {Path(gf): gf for gf in graph_files}
+    for gp in _existing_paths(list(graph_paths)):
+        gf = graph_paths[gp]
         if gf not in active_files and active_tokens < budget_active:
             try:
-                gf_path = Path(gf)
-                if gf_path.exists():
-                    content = gf_path.read_text(encoding='utf-8')[:1500]
+                content = _read_snippet(gp, 1500)
+                if content is not None:
                     active_files[gf] = content
-                    active_tokens += len(content.split())
+                    active_tokens += estimate_tokens(content)
             except Exception:
                 pass
 
-    # 3c. Dependencies of Active Files
-    for path in list(active_files.keys())[:2]:
-        try:
-            from .deps import analyze_imports
-            deps = analyze_imports(Path(path))
+    # 3c. Dependencies of Active Files (collect all, check existence once)
+    dep_candidates = {}
+    try:
+        from .deps import analyze_imports
+        for path in list(islice(active_files, 2)):
+            try:
+                deps = analyze_imports(Path(path))
+            except Exception:
+                continue
             if deps:
-                for imp in list(deps.imports)[:2]:
+                for imp in islice(deps.imports, 2):
                     local_path = root / f"{imp.replace('.', '/')}.py"
-                    if local_path.exists() and str(local_path) not in active_files:
-                        if active_tokens + 200 < budget_active:
-                            dep_content = local_path.read_text(encoding='utf-8')[:1000]
-                            active_files[str(local_path)] = dep_content
-                            active_tokens += len(dep_content.split())
-        except Exception:
-            pass
+                    dep_candidates.setdefault(local_path, None)
+    except Exception:
+        pass
+
+    for local_path in _existing_paths(list(dep_candidates)):
+        if str(local_path) not in active_files and active_tokens + 200 < budget_active:
+            try:
+                dep_content = _read_snippet(local_path, 1000)
+            except Exception:
+                continue
+            if dep_content is not None:
+                active_files[str(local_path)] = dep_content
+                active_tokens += estimate_tokens(dep_content)
 
     # 3d. Semantic Search Results
     semantic_content = []
@@ -392,7 +638,7 @@ def get_auto_context(
         for path, content in semantic.files:
             if path not in active_files and semantic_tokens < budget_semantic:
                 semantic_content.append(f"## {Path(path).name} (Semantic Match)\n```python\n{content[:1500]}\n```")
-                semantic_tokens += len(content.split())
+                semantic_tokens += estimate_tokens(content)
 
     # =========================================================================
     # ASSEMBLE FINAL OUTPUT
@@ -402,7 +648,7 @@ def get_auto_context(
 
     if active_files:
         final_output.append("\n# Active Context")
-        for path, content in list(active_files.items())[:5]:
+        for path, content in islice(active_files.items(), 5):
             final_output.append(f"## {Path(path).name}\n# {path}\n```python\n{content}\n```\n")
 
     if semantic_content:
@@ -418,7 +664,7 @@ def update_task(task: str, root: Path = None):
     """Update current task in cache."""
     cache = load_cache(root)
     cache.last_task = task
-    save_cache(cache, root)
+    save_cache(cache, root, defer=True)
 
 
 def main():
@@ -427,7 +673,7 @@ def main():
 
     args = [a for a in sys.argv[1:] if not a.startswith('-')]
 
-    root = get_project_boundary() or find_project_root() or Path.cwd()
+    root = resolve_project_root()
 
     if '--recent' in sys.argv:
         result = get_recent_context(root=root)
@@ -10,26 +10,32 @@ Maps:
 
 Usage:
     python mcp.py graph "function_name"    # Find what calls/is called by
-    python mcp.py graph --build            # Rebuild graph
+    python mcp.py graph --build            # Rebuild graph (reparses changed files)
+    python mcp.py graph --rebuild          # Rebuild graph from scratch
     python mcp.py graph --stats            # Show graph statistics
+    python mcp.py graph --repl             # Query names from stdin, one per line
 """
 
 import ast
-import json
+import os
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any
+from typing import Dict, List, Optional, Set, Any, Tuple
 
 from .utils import (
     find_python_files,
     find_project_root,
     get_project_boundary,
+    read_json,
+    write_json,
     Console
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class GraphNode:
     """A node in the call graph."""
     name: str
@@ -39,7 +45,7 @@ class GraphNode:
     qualified_name: str  # e.g., "module.Class.method"
 
 
-@dataclass
+@dataclass(slots=True)
 class GraphEdge:
     """An edge in the call graph."""
     source: str  # qualified name
@@ -49,6 +55,52 @@ class GraphEdge:
     line: int
 
 
+def _edges_to_columns(edges: List[GraphEdge]) -> dict:
+    """
+    Store edges column-wise for serialization.
+
+    Names, files and edge types are interned into tables and each edge
+    becomes one integer per column, so repeated strings are written once.
+    """
+    names: Dict[str, int] = {}
+    files: Dict[str, int] = {}
+    types: Dict[str, int] = {}
+    source, target, edge_type, file, line = [], [], [], [], []
+    for e in edges:
+        source.append(names.setdefault(e.source, len(names)))
+        target.append(names.setdefault(e.target, len(names)))
+        edge_type.append(types.setdefault(e.edge_type, len(types)))
+        file.append(files.setdefault(e.file, len(files)))
+        line.append(e.line)
+    return {
+        'names': list(names),
+        'files': list(files),
+        'edge_types': list(types),
+        'source': source,
+        'target': target,
+        'edge_type': edge_type,
+        'file': file,
+        'line': line,
+    }
+
+
+def _edges_from_columns(columns: dict) -> List[GraphEdge]:
+    """Inverse of _edges_to_columns."""
+    names, files, types = columns['names'], columns['files'], columns['edge_types']
+    return [
+        GraphEdge(source=names[s], target=names[t], edge_type=types[k], file=files[f], line=line)
+        for s, t, k, f, line in zip(
+            columns['source'], columns['target'], columns['edge_type'],
+            columns['file'], columns['line'],
+        )
+    ]
+
+
+def _short_name(name: str) -> str:
+    """Last dotted component of a qualified name."""
+    return name.rpartition('.')[2]
+
+
 @dataclass
 class CallGraph:
     """The complete call graph for a codebase."""
@@ -59,26 +111,94 @@ class CallGraph:
     # Indexes for fast lookup
     callers: Dict[str, List[str]] = field(default_factory=dict)  # target -> [sources]
     callees: Dict[str, List[str]] = field(default_factory=dict)  # source -> [targets]
+
+    # Short-name indexes so partial matches don't scan every key. Derived
+    # from the fields above; built on load and never saved.
+    _node_names: Dict[str, Dict[str, int]] = field(default_factory=dict, repr=False, compare=False)  # name -> {qualified: position}
+    _caller_names: Dict[str, Dict[str, None]] = field(default_factory=dict, repr=False, compare=False)
+    _callee_names: Dict[str, Dict[str, None]] = field(default_factory=dict, repr=False, compare=False)
+    _lower_names: Dict[str, Tuple[str, str]] = field(default_factory=dict, repr=False, compare=False)
+    _edge_pairs: Optional[Set[Tuple[str, str]]] = field(default_factory=set, repr=False, compare=False)  # None: derive from callees when needed
+    _query_cache: Dict[str, dict] = field(default_factory=dict, repr=False, compare=False)  # query -> query_graph result
     
     def add_node(self, node: GraphNode):
         """Add a node to the graph."""
-        self.nodes[node.qualified_name] = node
+        if self._query_cache:
+            self._query_cache.clear()
+        qualified_name = node.qualified_name
+        short = self._node_names.setdefault(_short_name(qualified_name), {})
+        if qualified_name not in self.nodes:
+            short[qualified_name] = len(self.nodes)
+        self.nodes[qualified_name] = node
+        self._node_names.setdefault(node.name, {})[qualified_name] = short[qualified_name]
+        self._lower_names[qualified_name] = (qualified_name.lower(), node.name.lower())
     
     def add_edge(self, edge: GraphEdge):
         """Add an edge and update indexes."""
         self.edges.append(edge)
-        
+        self._index_edge(edge)
+
+    def _index_edge(self, edge: GraphEdge):
+        """Add an edge to the callers/callees indexes."""
+        source, target = edge.source, edge.target
+
+        # A (source, target) pair is in both indexes or neither, so one set
+        # replaces the list membership scans
+        pair = (source, target)
+        if self._edge_pairs is None:
+            self._edge_pairs = {(s, t) for s, targets in self.callees.items() for t in targets}
+        if pair in self._edge_pairs:
+            return
+        self._edge_pairs.add(pair)
+        if self._query_cache:
+            self._query_cache.clear()
+
         # Update caller index
-        if edge.target not in self.callers:
-            self.callers[edge.target] = []
-        if edge.source not in self.callers[edge.target]:
-            self.callers[edge.target].append(edge.source)
-        
+        callers = self.callers.get(target)
+        if callers is None:
+            callers = self.callers[target] = []
+            self._caller_names.setdefault(_short_name(target), {})[target] = None
+        callers.append(source)
+
         # Update callee index
-        if edge.source not in self.callees:
-            self.callees[edge.source] = []
-        if edge.target not in self.callees[edge.source]:
-            self.callees[edge.source].append(edge.target)
+        callees = self.callees.get(source)
+        if callees is None:
+            callees = self.callees[source] = []
+            self._callee_names.setdefault(_short_name(source), {})[source] = None
+        callees.append(target)
+
+    def _build_edge_indexes(self):
+        """
+        Build callers/callees from all edges in one sweep.
+
+        Same result as indexing edge by edge, without the per-edge pair
+        checks; the pair set is only derived if an edge is added later.
+        """
+        callers: Dict[str, Dict[str, None]] = {}
+        callees: Dict[str, Dict[str, None]] = {}
+        for e in self.edges:
+            callers.setdefault(e.target, {})[e.source] = None
+            callees.setdefault(e.source, {})[e.target] = None
+
+        self.callers = {k: list(v) for k, v in callers.items()}
+        self.callees = {k: list(v) for k, v in callees.items()}
+        self._edge_pairs = None
+        self._query_cache.clear()
+
+        self._caller_names, self._callee_names = {}, {}
+        for key in self.callers:
+            self._caller_names.setdefault(_short_name(key), {})[key] = None
+        for key in self.callees:
+            self._callee_names.setdefault(_short_name(key), {})[key] = None
+
+    @staticmethod
+    def _partial_matches(index: Dict[str, dict], name: str) -> List[str]:
+        """Keys in a short-name index equal to name or ending in '.' + name."""
+        suffix = '.' + name
+        return [
+            key for key in index.get(_short_name(name), ())
+            if key == name or key.endswith(suffix)
+        ]
     
     def get_callers(self, name: str) -> List[str]:
         """Get all functions that call the given name."""
@@ -86,41 +206,49 @@ class CallGraph:
         if name in self.callers:
             return self.callers[name]
         
-        # Try partial match
-        matches = []
-        for qualified_name, callers in self.callers.items():
-            if qualified_name.endswith('.' + name) or qualified_name == name:
-                matches.extend(callers)
-        return list(set(matches))
+        # Try partial match (deduped, first-seen order)
+        matches: Dict[str, None] = {}
+        for qualified_name in self._partial_matches(self._caller_names, name):
+            matches.update(dict.fromkeys(self.callers[qualified_name]))
+        return list(matches)
     
     def get_callees(self, name: str) -> List[str]:
         """Get all functions called by the given name."""
         if name in self.callees:
             return self.callees[name]
         
-        # Try partial match
-        matches = []
-        for qualified_name, callees in self.callees.items():
-            if qualified_name.endswith('.' + name) or qualified_name == name:
-                matches.extend(callees)
-        return list(set(matches))
+        # Try partial match (deduped, first-seen order)
+        matches: Dict[str, None] = {}
+        for qualified_name in self._partial_matches(self._callee_names, name):
+            matches.update(dict.fromkeys(self.callees[qualified_name]))
+        return list(matches)
     
     def find_node(self, name: str) -> Optional[GraphNode]:
         """Find a node by name (exact or partial match)."""
         if name in self.nodes:
             return self.nodes[name]
-        
-        for qualified_name, node in self.nodes.items():
-            if qualified_name.endswith('.' + name) or node.name == name:
-                return node
-        return None
+
+        # First node in graph order whose qualified name ends with '.name'
+        # or whose short name is name
+        suffix = '.' + name
+        best = None
+        for bucket in (self._node_names.get(_short_name(name), {}), self._node_names.get(name, {})):
+            for qualified_name, position in bucket.items():
+                node = self.nodes[qualified_name]
+                if best is not None and position >= best[0]:
+                    continue
+                if qualified_name.endswith(suffix) or node.name == name:
+                    best = (position, node)
+        return best[1] if best else None
     
     def search_nodes(self, query: str) -> List[GraphNode]:
         """Search for nodes matching query."""
         query_lower = query.lower()
         matches = []
+        lower_names = self._lower_names
         for qualified_name, node in self.nodes.items():
-            if query_lower in qualified_name.lower() or query_lower in node.name.lower():
+            qualified_lower, name_lower = lower_names[qualified_name]
+            if query_lower in qualified_lower or query_lower in name_lower:
                 matches.append(node)
         return matches
     
@@ -129,9 +257,8 @@ class CallGraph:
         return {
             'root': str(self.root),
             'nodes': {k: asdict(v) for k, v in self.nodes.items()},
-            'edges': [asdict(e) for e in self.edges],
-            'callers': self.callers,
-            'callees': self.callees
+            'edges': _edges_to_columns(self.edges),
+            # callers/callees are derived from edges and rebuilt on load
         }
     
     @classmethod
@@ -140,19 +267,28 @@ class CallGraph:
         graph = cls(root=Path(data['root']))
         
         for k, v in data.get('nodes', {}).items():
-            graph.nodes[k] = GraphNode(**v)
+            graph.add_node(GraphNode(**v))
         
-        for e in data.get('edges', []):
-            graph.edges.append(GraphEdge(**e))
+        edges = data.get('edges', [])
+        if isinstance(edges, dict):
+            graph.edges = _edges_from_columns(edges)
+        else:  # older files store one dict per edge
+            graph.edges = [GraphEdge(**e) for e in edges]
         
-        graph.callers = data.get('callers', {})
-        graph.callees = data.get('callees', {})
+        graph._build_edge_indexes()
         
         return graph
 
 
-class CallGraphBuilder(ast.NodeVisitor):
-    """AST visitor to build call graph from Python files."""
+class CallGraphBuilder:
+    """
+    AST walker to build call graph from Python files.
+
+    Walks the tree with an explicit stack and a type-keyed handler table
+    instead of ast.NodeVisitor's per-node method lookup and recursion.
+    Handlers that open a scope return the scope to restore once their
+    children are done. Traversal order matches NodeVisitor's.
+    """
     
     def __init__(self, graph: CallGraph, file_path: Path, module_name: str):
         self.graph = graph
@@ -170,6 +306,32 @@ class CallGraphBuilder(ast.NodeVisitor):
         if self.current_function:
             parts.append(self.current_function)
         return '.'.join(parts)
+
+    def visit(self, tree: ast.AST):
+        """Walk tree depth-first, dispatching to the handlers."""
+        handlers = _HANDLERS
+        stack = [tree]
+        while stack:
+            item = stack.pop()
+            if type(item) is tuple:  # scope saved by a handler, children done
+                self.current_class, self.current_function = item
+                continue
+            handler = handlers.get(type(item))
+            if handler is not None:
+                saved_scope = handler(self, item)
+                if saved_scope is not None:
+                    stack.append(saved_scope)
+            # Inlined ast.iter_child_nodes, pushed in reverse so children
+            # pop in field order
+            children = []
+            for name in item._fields:
+                value = getattr(item, name, None)
+                if isinstance(value, list):
+                    children.extend(child for child in value if isinstance(child, ast.AST))
+                elif isinstance(value, ast.AST):
+                    children.append(value)
+            children.reverse()
+            stack.extend(children)
     
     def visit_Import(self, node: ast.Import):
         """Track imports."""
@@ -185,7 +347,6 @@ class CallGraphBuilder(ast.NodeVisitor):
                 file=str(self.file_path),
                 line=node.lineno
             ))
-        self.generic_visit(node)
     
     def visit_ImportFrom(self, node: ast.ImportFrom):
         """Track from imports."""
@@ -202,9 +363,8 @@ class CallGraphBuilder(ast.NodeVisitor):
                     file=str(self.file_path),
                     line=node.lineno
                 ))
-        self.generic_visit(node)
     
-    def visit_ClassDef(self, node: ast.ClassDef):
+    def visit_ClassDef(self, node: ast.ClassDef) -> Tuple[Optional[str], Optional[str]]:
         """Process class definition."""
         qualified_name = f"{self.module_name}.{node.name}"
         
@@ -229,19 +389,18 @@ class CallGraphBuilder(ast.NodeVisitor):
                     line=node.lineno
                 ))
         
-        # Process class body
-        old_class = self.current_class
+        # Process class body in the class scope
+        saved_scope = (self.current_class, self.current_function)
         self.current_class = node.name
-        self.generic_visit(node)
-        self.current_class = old_class
+        return saved_scope
     
     def visit_FunctionDef(self, node: ast.FunctionDef):
         """Process function definition."""
-        self._visit_function(node)
+        return self._visit_function(node)
     
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
         """Process async function definition."""
-        self._visit_function(node)
+        return self._visit_function(node)
     
     def _visit_function(self, node):
         """Process function/method definition."""
@@ -261,11 +420,10 @@ class CallGraphBuilder(ast.NodeVisitor):
             qualified_name=qualified_name
         ))
         
-        # Process function body for calls
-        old_function = self.current_function
+        # Process function body for calls in the function scope
+        saved_scope = (self.current_class, self.current_function)
         self.current_function = node.name
-        self.generic_visit(node)
-        self.current_function = old_function
+        return saved_scope
     
     def visit_Call(self, node: ast.Call):
         """Process function call."""
@@ -281,8 +439,6 @@ class CallGraphBuilder(ast.NodeVisitor):
                     file=str(self.file_path),
                     line=node.lineno
                 ))
-        
-        self.generic_visit(node)
     
     def _get_name(self, node: ast.expr) -> Optional[str]:
         """Get name from expression node."""
@@ -305,8 +461,130 @@ class CallGraphBuilder(ast.NodeVisitor):
         return self._get_name(node.func)
 
 
-def build_call_graph(root: Path, exclude_patterns: List[str] = None) -> CallGraph:
-    """Build call graph for a codebase."""
+_HANDLERS = {
+    ast.Import: CallGraphBuilder.visit_Import,
+    ast.ImportFrom: CallGraphBuilder.visit_ImportFrom,
+    ast.ClassDef: CallGraphBuilder.visit_ClassDef,
+    ast.FunctionDef: CallGraphBuilder.visit_FunctionDef,
+    ast.AsyncFunctionDef: CallGraphBuilder.visit_AsyncFunctionDef,
+    ast.Call: CallGraphBuilder.visit_Call,
+}
+
+
+# Below this many files a process pool costs more to start than it saves
+_PARALLEL_MIN_FILES = 64
+
+
+def _module_name(path: Path, root: Path) -> str:
+    """Get dotted module name from path."""
+    try:
+        relative = path.relative_to(root)
+        return str(relative.with_suffix('')).replace('/', '.').replace('\\', '.')
+    except ValueError:
+        return path.stem
+
+
+def _parse_one(path: Path, root: Path) -> Tuple[List[GraphNode], List[GraphEdge], Optional[str]]:
+    """
+    Parse a single file into its nodes and edges.
+
+    Builds into a throwaway graph so it can run in a worker process;
+    returns (nodes, edges, warning).
+    """
+    local = CallGraph(root=root)
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            source = f.read()
+
+        # Only imports, classes and functions (with the calls inside them)
+        # produce nodes or edges, so a file without those keywords - an
+        # empty __init__.py, a constants module - needs no parse at all
+        tree = None
+        if 'import' in source or 'def' in source or 'class' in source:
+            tree = ast.parse(source, filename=str(path), type_comments=False)
+        module_name = _module_name(path, root)
+
+        # Add module node
+        local.add_node(GraphNode(
+            name=path.name,
+            node_type='module',
+            file=str(path),
+            line=1,
+            qualified_name=module_name
+        ))
+
+        # Build graph from AST
+        if tree is not None:
+            builder = CallGraphBuilder(local, path, module_name)
+            builder.visit(tree)
+
+    except SyntaxError:
+        return [], [], f"Syntax error in {path}"
+    except Exception as e:
+        return [], [], f"Error processing {path}: {e}"
+
+    return list(local.nodes.values()), local.edges, None
+
+
+def _parse_one_star(args: Tuple[Path, Path]):
+    """Unpack (path, root) for executor.map."""
+    return _parse_one(*args)
+
+
+# Per-file parse results are kept in a sidecar keyed by (mtime, size) so
+# rebuilds only reparse changed files. Bump the version when the builder's
+# output changes.
+_FILE_CACHE_VERSION = 1
+
+
+def get_file_cache_path(root: Path) -> Path:
+    """Get path to the per-file parse cache."""
+    return root / '.mcp' / 'call_graph_cache.json'
+
+
+def _load_file_cache(root: Path) -> Dict[str, list]:
+    """Load cached per-file results: path -> [mtime_ns, size, nodes, edges, warning]."""
+    try:
+        cache = read_json(get_file_cache_path(root))
+        if cache.get('version') == _FILE_CACHE_VERSION and cache.get('root') == str(root):
+            return cache['files']
+    except Exception:
+        pass
+    return {}
+
+
+def _encode_result(nodes: List[GraphNode], edges: List[GraphEdge], warning: Optional[str]) -> list:
+    """Pack one file's results as rows; the file field is the cache key."""
+    return [
+        [[n.name, n.node_type, n.line, n.qualified_name] for n in nodes],
+        [[e.source, e.target, e.edge_type, e.line] for e in edges],
+        warning,
+    ]
+
+
+def _decode_result(file: str, packed: list) -> Tuple[List[GraphNode], List[GraphEdge], Optional[str]]:
+    """Inverse of _encode_result."""
+    nodes, edges, warning = packed
+    return (
+        [GraphNode(name, node_type, file, line, qualified_name)
+         for name, node_type, line, qualified_name in nodes],
+        [GraphEdge(source, target, edge_type, file, line)
+         for source, target, edge_type, line in edges],
+        warning,
+    )
+
+
+def build_call_graph(
+    root: Path,
+    exclude_patterns: List[str] = None,
+    use_cache: bool = True
+) -> CallGraph:
+    """
+    Build call graph for a codebase.
+
+    Files unchanged since the last build are replayed from the parse cache;
+    the rest are parsed in parallel. use_cache=False reparses everything.
+    """
     root = Path(root).resolve()
     graph = CallGraph(root=root)
     
@@ -314,38 +592,66 @@ def build_call_graph(root: Path, exclude_patterns: List[str] = None) -> CallGrap
     
     files = list(find_python_files(root, exclude_patterns))
     Console.info(f"Analyzing {len(files)} files...")
-    
-    for path in files:
+
+    cache = _load_file_cache(root) if use_cache else {}
+    new_cache: Dict[str, list] = {}
+    results: List[Optional[tuple]] = [None] * len(files)
+    misses = []  # (index, path, [mtime_ns, size] or None)
+
+    for i, path in enumerate(files):
+        key = str(path)
         try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                source = f.read()
-            
-            tree = ast.parse(source, filename=str(path))
-            
-            # Get module name from path
-            try:
-                relative = path.relative_to(root)
-                module_name = str(relative.with_suffix('')).replace('/', '.').replace('\\', '.')
-            except ValueError:
-                module_name = path.stem
-            
-            # Add module node
-            graph.add_node(GraphNode(
-                name=path.name,
-                node_type='module',
-                file=str(path),
-                line=1,
-                qualified_name=module_name
-            ))
-            
-            # Build graph from AST
-            builder = CallGraphBuilder(graph, path, module_name)
-            builder.visit(tree)
-            
-        except SyntaxError:
-            Console.warn(f"Syntax error in {path}")
+            st = path.stat()
+            stamp = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            stamp = None
+        entry = cache.get(key)
+        if stamp and entry and entry[:2] == stamp:
+            results[i] = _decode_result(key, entry[2:])
+            new_cache[key] = entry
+        else:
+            misses.append((i, path, stamp))
+
+    if len(misses) < len(files):
+        Console.info(f"Reusing {len(files) - len(misses)} unchanged files")
+
+    jobs = [(path, root) for _, path, _ in misses]
+    parsed = None
+    # Only fork from the main thread: autocontext loads the graph from a
+    # worker thread, and forking while other threads hold locks can deadlock
+    if (len(jobs) >= _PARALLEL_MIN_FILES and (os.cpu_count() or 1) > 1
+            and threading.current_thread() is threading.main_thread()):
+        try:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                parsed = list(executor.map(_parse_one_star, jobs, chunksize=16))
         except Exception as e:
-            Console.warn(f"Error processing {path}: {e}")
+            Console.warn(f"Parallel parse failed, falling back to serial: {e}")
+    if parsed is None:
+        parsed = map(_parse_one_star, jobs)
+
+    for (i, path, stamp), result in zip(misses, parsed):
+        results[i] = result
+        if stamp:
+            new_cache[str(path)] = stamp + _encode_result(*result)
+
+    # Merge on the main process so indexes are built in file order
+    for nodes, edges, warning in results:
+        if warning:
+            Console.warn(warning)
+        for node in nodes:
+            graph.add_node(node)
+        for edge in edges:
+            graph.add_edge(edge)
+
+    if misses or len(new_cache) != len(cache):
+        try:
+            write_json(get_file_cache_path(root), {
+                'version': _FILE_CACHE_VERSION,
+                'root': str(root),
+                'files': new_cache,
+            })
+        except OSError as e:
+            Console.warn(f"Could not save parse cache: {e}")
     
     Console.ok(f"Built graph: {len(graph.nodes)} nodes, {len(graph.edges)} edges")
     
@@ -361,33 +667,65 @@ def save_call_graph(graph: CallGraph, root: Path = None):
     mcp_dir.mkdir(parents=True, exist_ok=True)
     
     graph_file = mcp_dir / 'call_graph.json'
-    with open(graph_file, 'w', encoding='utf-8') as f:
-        json.dump(graph.to_dict(), f, indent=2)
+    write_json(graph_file, graph.to_dict())
+    _LOADED[graph_file] = (graph_file.stat().st_mtime_ns, graph)
     
     Console.ok(f"Saved call graph to {graph_file}")
 
 
+# Loaded graphs by file: path -> (mtime_ns, graph), so tools that each
+# load the graph in one process share a single parse
+_LOADED: Dict[Path, Tuple[int, CallGraph]] = {}
+
+
 def load_call_graph(root: Path = None) -> Optional[CallGraph]:
-    """Load call graph from .mcp directory."""
+    """Load call graph from .mcp directory (reused until the file changes)."""
     if root is None:
         root = get_project_boundary() or find_project_root() or Path.cwd()
     
     graph_file = root / '.mcp' / 'call_graph.json'
     
-    if not graph_file.exists():
+    try:
+        mtime_ns = graph_file.stat().st_mtime_ns
+    except OSError:
         return None
+
+    cached = _LOADED.get(graph_file)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
     
     try:
-        with open(graph_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return CallGraph.from_dict(data)
+        graph = CallGraph.from_dict(read_json(graph_file))
     except Exception as e:
         Console.warn(f"Could not load call graph: {e}")
         return None
 
+    _LOADED[graph_file] = (mtime_ns, graph)
+    return graph
+
+
+# Memoized results kept per graph
+_QUERY_CACHE_SIZE = 256
+
 
 def query_graph(graph: CallGraph, query: str) -> dict:
-    """Query the call graph and return results."""
+    """
+    Query the call graph and return results.
+
+    Results are memoized on the graph until it changes; callers get their
+    own copy to modify.
+    """
+    cache = graph._query_cache
+    result = cache.get(query)
+    if result is None:
+        if len(cache) >= _QUERY_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        result = cache[query] = _query_graph(graph, query)
+    return {k: list(v) if isinstance(v, list) else v for k, v in result.items()}
+
+
+def _query_graph(graph: CallGraph, query: str) -> dict:
+    """Uncached worker for query_graph."""
     results = {
         'query': query,
         'node': None,
@@ -471,6 +809,16 @@ def format_query_result(result: dict) -> str:
     return '\n'.join(lines)
 
 
+def _load_or_build(root: Path) -> CallGraph:
+    """Load the saved graph, building and saving it first if missing."""
+    graph = load_call_graph(root)
+    if not graph:
+        Console.info("Building graph first...")
+        graph = build_call_graph(root)
+        save_call_graph(graph, root)
+    return graph
+
+
 def main():
     """CLI entry point."""
     Console.header("Call Graph")
@@ -481,7 +829,7 @@ def main():
     
     # Build graph
     if '--build' in sys.argv or '--rebuild' in sys.argv:
-        graph = build_call_graph(root)
+        graph = build_call_graph(root, use_cache='--rebuild' not in sys.argv)
         save_call_graph(graph, root)
         return 0
     
@@ -503,15 +851,20 @@ def main():
             Console.warn("No graph found. Run with --build first.")
         return 0
     
+    # Interactive: keep the graph loaded and answer one query per line
+    if '--repl' in sys.argv:
+        graph = _load_or_build(root)
+        for line in sys.stdin:
+            query = line.strip()
+            if query:
+                print(format_query_result(query_graph(graph, query)))
+        return 0
+    
     # Query
     if args:
         query = args[0]
         
-        graph = load_call_graph(root)
-        if not graph:
-            Console.info("Building graph first...")
-            graph = build_call_graph(root)
-            save_call_graph(graph, root)
+        graph = _load_or_build(root)
         
         result = query_graph(graph, query)
         print(format_query_result(result))
@@ -521,7 +874,9 @@ def main():
     Console.info("Usage:")
     Console.info("  mcp graph \"function_name\"  - Query what calls/is called by")
     Console.info("  mcp graph --build          - Build/rebuild the call graph")
+    Console.info("  mcp graph --rebuild        - Rebuild ignoring the parse cache")
     Console.info("  mcp graph --stats          - Show graph statistics")
+    Console.info("  mcp graph --repl           - Query names read from stdin")
     
     return 0
 
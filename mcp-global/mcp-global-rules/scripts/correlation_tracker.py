@@ -15,35 +15,66 @@ Usage:
     python mcp.py correlate "file.py"      # Show correlations for file
 """
 
-import json
+import functools
 import sys
-from collections import defaultdict
+import time
+from collections import Counter
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
+from itertools import chain, combinations
 from pathlib import Path
 from typing import Dict, List, Set, Optional, Tuple
 
+# Try numba for counting pairs over large histories
+try:
+    import numpy as np
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
 from .utils import (
     find_project_root,
     get_project_boundary,
-    run_git_command,
+    stream_git_command,
+    json_dumps,
+    json_loads,
+    read_json,
+    write_atomic,
+    write_json,
     Console
 )
 
 
-@dataclass
+@functools.lru_cache(maxsize=4096)
+def _basename(path: str) -> str:
+    """File name of a stored path (same paths repeat across many pairs)."""
+    return path.rsplit('/', 1)[-1].rsplit('\\', 1)[-1]
+
+
+def _counts(table: Dict[str, Counter], key: str) -> Counter:
+    """Get the Counter for key in a correlation table, adding it if missing."""
+    counts = table.get(key)
+    if counts is None:
+        counts = table[key] = Counter()
+    return counts
+
+
+@dataclass(slots=True)
 class CorrelationData:
     """Stores all correlation learning data."""
     root: Path
     
-    # Co-modification: which files change together
-    comod_counts: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    # Co-modification: which files change together. Each pair is stored
+    # once, under the lower path: comod_counts[min][max]
+    comod_counts: Dict[str, Counter] = field(default_factory=dict)
     
     # Access patterns: which files are accessed together
-    access_counts: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    access_counts: Dict[str, Counter] = field(default_factory=dict)
     
     # Test correlations: which files fail together
-    test_correlations: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    test_correlations: Dict[str, Counter] = field(default_factory=dict)
     
     # Patterns learned
     learned_patterns: List[str] = field(default_factory=list)
@@ -51,6 +82,57 @@ class CorrelationData:
     # Metadata
     last_updated: str = ""
     commits_analyzed: int = 0
+
+    # Bytes of the access log already replayed into this data
+    _wal_offset: int = field(default=0, repr=False, compare=False)
+
+    # comod_counts keyed by the higher path; built on first lookup
+    _comod_reverse: Optional[Dict[str, Dict[str, int]]] = field(default=None, repr=False, compare=False)
+
+    # basename -> co-modified and accessed files; built on first lookup
+    _by_basename: Optional[Dict[str, List[str]]] = field(default=None, repr=False, compare=False)
+
+    def add_comod(self, f1: str, f2: str, count: int = 1):
+        """Record count co-modifications of an unordered file pair."""
+        if f2 < f1:
+            f1, f2 = f2, f1
+        _counts(self.comod_counts, f1)[f2] += count
+        self._comod_reverse = None
+        self._by_basename = None
+
+    def comod_pairs(self):
+        """Yield (f1, f2, count) once per co-modified pair."""
+        for f1, others in self.comod_counts.items():
+            for f2, count in others.items():
+                yield f1, f2, count
+
+    def _reverse_index(self) -> Dict[str, Dict[str, int]]:
+        """comod_counts keyed by the higher path of each pair."""
+        if self._comod_reverse is None:
+            reverse: Dict[str, Dict[str, int]] = {}
+            for f1, f2, count in self.comod_pairs():
+                reverse.setdefault(f2, {})[f1] = count
+            self._comod_reverse = reverse
+        return self._comod_reverse
+
+    def comod_files(self) -> List[str]:
+        """All files with at least one co-modification."""
+        return list(dict.fromkeys(chain(self.comod_counts, self._reverse_index())))
+
+    def files_named(self, name: str) -> List[str]:
+        """Co-modified or accessed files whose basename is name."""
+        if self._by_basename is None:
+            index: Dict[str, List[str]] = {}
+            for key in dict.fromkeys(chain(self.comod_files(), self.access_counts)):
+                index.setdefault(_basename(key), []).append(key)
+            self._by_basename = index
+        return self._by_basename.get(name, [])
+
+    def comod_partners(self, file: str) -> Dict[str, int]:
+        """Files co-modified with file, with counts."""
+        partners = dict(self.comod_counts.get(file, {}))
+        partners.update(self._reverse_index().get(file, {}))
+        return partners
     
     def to_dict(self) -> dict:
         return {
@@ -67,14 +149,17 @@ class CorrelationData:
     def from_dict(cls, data: dict) -> 'CorrelationData':
         cd = cls(root=Path(data['root']))
         
+        # Older files stored both directions; keep lower-path-first only
         for k, v in data.get('comod_counts', {}).items():
-            cd.comod_counts[k] = defaultdict(int, v)
+            v = {related: count for related, count in v.items() if k < related}
+            if v:
+                cd.comod_counts[k] = Counter(v)
         
         for k, v in data.get('access_counts', {}).items():
-            cd.access_counts[k] = defaultdict(int, v)
+            cd.access_counts[k] = Counter(v)
         
         for k, v in data.get('test_correlations', {}).items():
-            cd.test_correlations[k] = defaultdict(int, v)
+            cd.test_correlations[k] = Counter(v)
         
         cd.learned_patterns = data.get('learned_patterns', [])
         cd.last_updated = data.get('last_updated', '')
@@ -88,31 +173,123 @@ def get_correlation_path(root: Path) -> Path:
     return root / '.mcp' / 'correlations.json'
 
 
+def get_wal_path(root: Path) -> Path:
+    """Get path to the file access log (appended to between saves)."""
+    return root / '.mcp' / 'correlation_wal.jsonl'
+
+
+# Compact the access log into correlations.json once it grows past this
+_WAL_COMPACT_BYTES = 64 * 1024
+
+
 def load_correlations(root: Path = None) -> CorrelationData:
-    """Load correlation data from disk."""
+    """Load correlation data from disk, replaying logged file accesses."""
     root = root or get_project_boundary() or find_project_root() or Path.cwd()
     corr_path = get_correlation_path(root)
-    
+
+    data = None
     if corr_path.exists():
         try:
-            with open(corr_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return CorrelationData.from_dict(data)
+            data = CorrelationData.from_dict(read_json(corr_path))
         except Exception:
             pass
-    
-    return CorrelationData(root=root)
+    data = data or CorrelationData(root=root)
+
+    _replay_wal(data)
+    return data
+
+
+def _replay_wal(data: CorrelationData):
+    """Apply access log entries to data (an incomplete last line is left)."""
+    try:
+        log = get_wal_path(data.root).read_bytes()
+    except OSError:
+        return
+
+    end = log.rfind(b'\n') + 1
+    for line in log[:end].splitlines():
+        try:
+            _apply_access(data, json_loads(line)['file'])
+        except Exception:
+            continue  # skip a corrupt entry rather than drop the log
+    data._wal_offset = end
 
 
 def save_correlations(data: CorrelationData):
-    """Save correlation data to disk."""
+    """Save correlation data to disk, folding in the replayed access log."""
     corr_path = get_correlation_path(data.root)
     corr_path.parent.mkdir(parents=True, exist_ok=True)
     
     data.last_updated = datetime.utcnow().isoformat() + 'Z'
     
-    with open(corr_path, 'w', encoding='utf-8') as f:
-        json.dump(data.to_dict(), f, indent=2)
+    write_json(corr_path, data.to_dict(), indent=True)
+
+    if data._wal_offset:
+        # Keep anything appended after data was loaded
+        wal_path = get_wal_path(data.root)
+        try:
+            rest = wal_path.read_bytes()[data._wal_offset:]
+            if rest:
+                write_atomic(wal_path, rest)
+            else:
+                wal_path.unlink()
+        except OSError:
+            pass
+        data._wal_offset = 0
+
+
+# Commit marker record in git log -z output (never a file path)
+_COMMIT_MARK = b'\x1e'
+_COMMIT_MARK_FORMAT = '%x1e'
+
+
+# Below this many pairs compiling the kernel costs more than it saves
+_JIT_MIN_PAIRS = 200_000
+
+
+def _pair_codes(commit_files, commit_offsets, pair_offsets, n_files, out):
+    """Write a * n_files + b for every pair (a, b), a before b, of each commit."""
+    for c in prange(len(commit_offsets) - 1):
+        start, end = commit_offsets[c], commit_offsets[c + 1]
+        pos = pair_offsets[c]
+        for i in range(start, end):
+            a = commit_files[i]
+            for j in range(i + 1, end):
+                out[pos] = a * n_files + commit_files[j]
+                pos += 1
+
+
+if NUMBA_AVAILABLE:
+    _pair_codes = njit(parallel=True, cache=True)(_pair_codes)
+
+
+def _count_pairs(commits: List[List[str]]) -> Counter:
+    """Count co-modified (f1, f2) pairs, f1 < f2, across commits."""
+    total = sum(len(files) * (len(files) - 1) // 2 for files in commits)
+    if not NUMBA_AVAILABLE or total < _JIT_MIN_PAIRS:
+        pair_counts: Counter = Counter()
+        for files in commits:
+            pair_counts.update(combinations(files, 2))
+        return pair_counts
+
+    # Intern paths in sorted order so ids compare like the paths do
+    names = sorted({f for files in commits for f in files})
+    ids = {name: i for i, name in enumerate(names)}
+    commit_files = np.fromiter((ids[f] for files in commits for f in files), dtype=np.int64)
+    sizes = np.array([len(files) for files in commits], dtype=np.int64)
+    commit_offsets = np.zeros(len(commits) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=commit_offsets[1:])
+    pair_offsets = np.zeros(len(commits), dtype=np.int64)
+    np.cumsum((sizes * (sizes - 1) // 2)[:-1], out=pair_offsets[1:])
+
+    out = np.empty(total, dtype=np.int64)
+    n = len(names)
+    _pair_codes(commit_files, commit_offsets, pair_offsets, n, out)
+    codes, counts = np.unique(out, return_counts=True)
+    return Counter({
+        (names[code // n], names[code % n]): int(count)
+        for code, count in zip(codes.tolist(), counts.tolist())
+    })
 
 
 def analyze_git_history(root: Path, max_commits: int = 200) -> CorrelationData:
@@ -125,42 +302,53 @@ def analyze_git_history(root: Path, max_commits: int = 200) -> CorrelationData:
     
     data = load_correlations(root)
     
-    # Get commit log with files
-    output = run_git_command(
-        ['log', '--name-only', '--format=%H|%an|%s', f'-n{max_commits}'],
-        cwd=root
-    )
-    
-    if not output:
+    # Stream the commit log as NUL-separated bytes: each commit is a bare
+    # marker record followed by the paths it touched (the first one
+    # newline-prefixed). Only .py paths are ever decoded.
+    commits: List[List[str]] = []  # sorted .py files per multi-file commit
+    decoded: Dict[bytes, str] = {}
+    got_output = False
+    files = None  # raw paths of the commit being read
+
+    def finish_commit():
+        if files is None or len(files) < 2:
+            return  # Need at least 2 files to correlate
+        py_files = []
+        for raw in files:
+            if raw.endswith(b'.py'):
+                path = decoded.get(raw)
+                if path is None:
+                    path = decoded[raw] = raw.decode('utf-8', errors='replace')
+                py_files.append(path)
+        # Sorted so each unordered pair has a single key
+        py_files.sort()
+        commits.append(py_files)
+
+    for record in stream_git_command(
+        ['log', '-z', '--name-only', f'--format={_COMMIT_MARK_FORMAT}', f'-n{max_commits}'],
+        cwd=root,
+        sep=b'\0'
+    ):
+        got_output = True
+        record = record.lstrip(b'\n')
+        if record == _COMMIT_MARK:
+            finish_commit()
+            files = []
+        elif record and files is not None:
+            files.append(record)
+
+    finish_commit()
+
+    if not got_output:
         Console.warn("Could not get git history")
         return data
-    
-    # Parse commits
-    commits = output.strip().split('\n\n')
-    new_commits = 0
-    
-    for commit_block in commits:
-        lines = commit_block.strip().split('\n')
-        if not lines:
-            continue
-        
-        # Parse header
-        header = lines[0]
-        files = [f for f in lines[1:] if f.strip()]
-        
-        if len(files) < 2:
-            continue  # Need at least 2 files to correlate
-        
-        # Record co-modifications
-        py_files = [f for f in files if f.endswith('.py')]
-        
-        for i, f1 in enumerate(py_files):
-            for f2 in py_files[i+1:]:
-                data.comod_counts[f1][f2] += 1
-                data.comod_counts[f2][f1] += 1
-        
-        new_commits += 1
-    
+
+    # Fold pair counts into the co-modification table (pairs are already
+    # sorted, so this is the stored orientation)
+    for (f1, f2), count in _count_pairs(commits).items():
+        data.add_comod(f1, f2, count)
+
+    new_commits = len(commits)
     data.commits_analyzed += new_commits
     Console.ok(f"Analyzed {new_commits} commits with multi-file changes")
     
@@ -176,87 +364,106 @@ def extract_patterns(data: CorrelationData) -> List[str]:
     """Extract high-confidence patterns from correlation data."""
     patterns = []
     
-    # Find highly correlated file pairs
-    for f1, others in data.comod_counts.items():
-        for f2, count in others.items():
-            if count >= 5:  # Must co-occur at least 5 times
-                p1 = Path(f1).name
-                p2 = Path(f2).name
-                pattern = f"{p1} and {p2} are strongly correlated ({count} co-modifications)"
-                if pattern not in patterns:
-                    patterns.append(pattern)
+    # Find highly correlated file pairs (each pair is stored once; names
+    # can still repeat across directories)
+    for f1, f2, count in data.comod_pairs():
+        if count >= 5:  # Must co-occur at least 5 times
+            p1 = _basename(f1)
+            p2 = _basename(f2)
+            patterns.append(f"{p1} and {p2} are strongly correlated ({count} co-modifications)")
     
     # Limit to top 20 patterns
-    return patterns[:20]
+    return list(dict.fromkeys(patterns))[:20]
 
 
 def get_correlations_for_file(file_path: str, data: CorrelationData, limit: int = 10) -> List[Tuple[str, int, str]]:
     """
     Get files correlated with the given file.
+
+    Files with the same basename are found through an index; a partial
+    name (no file has that basename) falls back to a substring scan.
     
     Returns: List of (related_file, strength, reason)
     """
-    results = []
-    file_name = Path(file_path).name
+    file_name = _basename(file_path)
+
+    keys = data.files_named(file_name)
+    if not keys:
+        keys = [
+            key for key in dict.fromkeys(chain(data.comod_files(), data.access_counts))
+            if file_name in key or file_path in key
+        ]
+
+    results: Dict[str, Tuple[int, str]] = {}  # related -> (strength, reason)
     
-    # Try to match by name or full path
-    for key in data.comod_counts.keys():
-        if file_name in key or file_path in key:
-            for related, count in data.comod_counts[key].items():
-                if count > 0:
-                    results.append((related, count, 'co-modified'))
+    # Co-modifications
+    for key in keys:
+        for related, count in data.comod_partners(key).items():
+            if count > 0:
+                results[related] = (count, 'co-modified')
     
     # Also check access correlations
-    for key in data.access_counts.keys():
-        if file_name in key or file_path in key:
-            for related, count in data.access_counts[key].items():
-                if count > 0:
-                    # Check if already in results
-                    existing = next((r for r in results if r[0] == related), None)
-                    if existing:
-                        # Boost existing
-                        idx = results.index(existing)
-                        results[idx] = (related, existing[1] + count, 'co-modified+accessed')
-                    else:
-                        results.append((related, count, 'co-accessed'))
+    for key in keys:
+        for related, count in data.access_counts.get(key, {}).items():
+            if count > 0:
+                existing = results.get(related)
+                if existing:
+                    # Boost existing
+                    results[related] = (existing[0] + count, 'co-modified+accessed')
+                else:
+                    results[related] = (count, 'co-accessed')
     
     # Sort by strength
-    results.sort(key=lambda x: x[1], reverse=True)
-    return results[:limit]
+    ranked = [(related, strength, reason) for related, (strength, reason) in results.items()]
+    ranked.sort(key=lambda x: x[1], reverse=True)
+    return ranked[:limit]
 
 
 def record_file_access(file_path: str, root: Path = None):
     """
     Record that a file was accessed.
     
-    Called by watcher or other tools to track access patterns.
+    Called by watcher or other tools to track access patterns. Appends
+    one line to the access log instead of rewriting correlations.json;
+    the log is replayed on load and folded in on the next save.
     """
     root = root or get_project_boundary() or find_project_root() or Path.cwd()
-    data = load_correlations(root)
-    
+    wal_path = get_wal_path(root)
+    wal_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(wal_path, 'ab') as f:
+        f.write(json_dumps({'file': file_path, 'ts': int(time.time())}) + b'\n')
+        size = f.tell()
+
+    if size >= _WAL_COMPACT_BYTES:
+        save_correlations(load_correlations(root))
+
+
+def _apply_access(data: CorrelationData, file_path: str):
+    """Update access correlations for one file access."""
     # Record with recent files (simple sliding window)
     recent_key = '_recent_accesses'
-    if recent_key not in data.access_counts:
-        data.access_counts[recent_key] = defaultdict(int)
+    recent_accesses = _counts(data.access_counts, recent_key)
     
     # Get recently accessed files (last 5)
-    recent = [f for f in data.access_counts.get(recent_key, {}).keys() if f != file_path][-5:]
+    recent = [f for f in recent_accesses if f != file_path][-5:]
     
     # Record correlations
+    if file_path not in data.access_counts:
+        data._by_basename = None
+    file_counts = _counts(data.access_counts, file_path)
     for recent_file in recent:
-        data.access_counts[file_path][recent_file] += 1
-        data.access_counts[recent_file][file_path] += 1
+        file_counts[recent_file] += 1
+        _counts(data.access_counts, recent_file)[file_path] += 1
     
     # Update recent list
-    data.access_counts[recent_key][file_path] = 1
-    
-    save_correlations(data)
+    recent_accesses[file_path] = 1
 
 
 def format_correlations(file_path: str, correlations: List[Tuple[str, int, str]]) -> str:
     """Format correlation results as markdown."""
     lines = [
-        f"# Correlations for {Path(file_path).name}",
+        f"# Correlations for {_basename(file_path)}",
         "",
     ]
     
@@ -266,7 +473,7 @@ def format_correlations(file_path: str, correlations: List[Tuple[str, int, str]]
         lines.append(f"**Found:** {len(correlations)} correlated files\n")
         
         for related, strength, reason in correlations:
-            lines.append(f"- `{Path(related).name}` (strength: {strength}, {reason})")
+            lines.append(f"- `{_basename(related)}` (strength: {strength}, {reason})")
     
     return '\n'.join(lines)
 
@@ -291,20 +498,15 @@ def format_all_patterns(data: CorrelationData) -> str:
     # Top correlations
     lines.append("\n## Top Co-Modified Files\n")
     
-    all_pairs = []
-    seen = set()
-    for f1, others in data.comod_counts.items():
-        for f2, count in others.items():
-            if count >= 3:  # Minimum threshold
-                key = tuple(sorted([f1, f2]))
-                if key not in seen:
-                    seen.add(key)
-                    all_pairs.append((f1, f2, count))
+    all_pairs = [
+        (f1, f2, count) for f1, f2, count in data.comod_pairs()
+        if count >= 3  # Minimum threshold
+    ]
     
     all_pairs.sort(key=lambda x: x[2], reverse=True)
     
     for f1, f2, count in all_pairs[:15]:
-        lines.append(f"- `{Path(f1).name}` <-> `{Path(f2).name}` ({count}x)")
+        lines.append(f"- `{_basename(f1)}` <-> `{_basename(f2)}` ({count}x)")
     
     return '\n'.join(lines)
 
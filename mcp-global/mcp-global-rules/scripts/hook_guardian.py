@@ -13,21 +13,28 @@ Usage:
     python mcp.py hook-guardian --status          # Show tracking status
 """
 
-import json
 import sys
-from dataclasses import dataclass, field, asdict
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 from .utils import (
     find_project_root,
     get_project_boundary,
+    read_json,
     run_git_command,
+    write_json,
     Console
 )
 
 
+# Commit records kept in the guardian file
+MAX_RECORDS = 100
+
+
 @dataclass
 class HookRecord:
     """Record of a commit passing through hooks."""
@@ -42,15 +49,16 @@ class HookRecord:
 class GuardianData:
     """Tracking data for hook enforcement."""
     root: Path
-    records: Dict[str, HookRecord] = field(default_factory=dict)  # hash -> record
+    records: 'OrderedDict[str, HookRecord]' = field(default_factory=OrderedDict)  # hash -> record, oldest first
     bypasses_detected: int = 0
     total_commits: int = 0
     last_updated: str = ""
     
     def to_dict(self) -> dict:
+        # Records are flat, so their instance dicts serialize without a copy
         return {
             'root': str(self.root),
-            'records': {k: asdict(v) for k, v in self.records.items()},
+            'records': {k: vars(v) for k, v in self.records.items()},
             'bypasses_detected': self.bypasses_detected,
             'total_commits': self.total_commits,
             'last_updated': self.last_updated,
@@ -63,7 +71,9 @@ class GuardianData:
         gd.total_commits = data.get('total_commits', 0)
         gd.last_updated = data.get('last_updated', '')
         
-        for k, v in data.get('records', {}).items():
+        # Older files were trimmed newest-first; restore chronological order
+        records = sorted(data.get('records', {}).items(), key=lambda kv: kv[1].get('timestamp', ''))
+        for k, v in records:
             gd.records[k] = HookRecord(**v)
         
         return gd
@@ -81,8 +91,7 @@ def load_guardian_data(root: Path = None) -> GuardianData:
     
     if path.exists():
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return GuardianData.from_dict(json.load(f))
+            return GuardianData.from_dict(read_json(path))
         except Exception:
             pass
     
@@ -92,12 +101,8 @@ def load_guardian_data(root: Path = None) -> GuardianData:
 def save_guardian_data(data: GuardianData):
     """Save guardian data to disk."""
     path = get_guardian_path(data.root)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    
     data.last_updated = datetime.utcnow().isoformat() + 'Z'
-    
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data.to_dict(), f, indent=2)
+    write_json(path, data.to_dict())
 
 
 def get_current_commit(root: Path) -> Optional[str]:
@@ -112,10 +117,18 @@ def get_commit_message(commit_hash: str, root: Path) -> str:
     return output.strip() if output else ""
 
 
+def get_head_commit(root: Path) -> Optional[Tuple[str, str]]:
+    """Get the HEAD commit hash and subject with a single git call."""
+    output = run_git_command(['log', '-1', '--format=%H%x00%s', 'HEAD'], cwd=root)
+    if not output:
+        return None
+    commit_hash, _, message = output.partition('\0')
+    return commit_hash, message.strip()
+
+
 def record_pre_commit(root: Path = None):
     """Record that pre-commit hook ran (called from pre-commit hook)."""
     root = root or get_project_boundary() or find_project_root() or Path.cwd()
-    data = load_guardian_data(root)
     
     # We don't have commit hash yet in pre-commit, so mark a flag
     flag_path = root / '.mcp' / '.pre_commit_ran'
@@ -128,13 +141,13 @@ def record_pre_commit(root: Path = None):
 def record_commit(root: Path = None):
     """Record that a commit was made (called from post-commit hook)."""
     root = root or get_project_boundary() or find_project_root() or Path.cwd()
-    data = load_guardian_data(root)
     
-    commit_hash = get_current_commit(root)
-    if not commit_hash:
+    head = get_head_commit(root)
+    if not head:
         return
     
-    message = get_commit_message(commit_hash, root)
+    commit_hash, message = head
+    data = load_guardian_data(root)
     
     # Check if pre-commit ran
     flag_path = root / '.mcp' / '.pre_commit_ran'
@@ -154,6 +167,7 @@ def record_commit(root: Path = None):
     )
     
     data.records[commit_hash[:12]] = record
+    data.records.move_to_end(commit_hash[:12])
     data.total_commits += 1
     
     # Check for bypass
@@ -167,10 +181,9 @@ def record_commit(root: Path = None):
     else:
         Console.ok(f"[Hook Guardian] Commit {commit_hash[:8]} tracked successfully")
     
-    # Keep only last 100 records
-    if len(data.records) > 100:
-        sorted_records = sorted(data.records.items(), key=lambda x: x[1].timestamp, reverse=True)
-        data.records = dict(sorted_records[:100])
+    # Keep only last MAX_RECORDS records
+    while len(data.records) > MAX_RECORDS:
+        data.records.popitem(last=False)
     
     save_guardian_data(data)
     
@@ -293,7 +306,8 @@ def show_status(root: Path = None):
     # Recent records
     if data.records:
         print("\n## Recent Commits\n")
-        recent = sorted(data.records.values(), key=lambda x: x.timestamp, reverse=True)[:10]
+        # Records are kept oldest-first, so the newest are at the end
+        recent = islice(reversed(data.records.values()), 10)
         
         for r in recent:
             status = "+" if r.pre_commit_ran else "BYPASS"
@@ -15,23 +15,46 @@ Usage:
     python mcp.py learn-patterns
 """
 
-import json
+import heapq
 import math
 import sys
-from collections import defaultdict
-from dataclasses import dataclass, field, asdict
-from datetime import datetime, timedelta
+import time
+import zlib
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import MISSING, dataclass, field, fields
+from datetime import datetime
+from itertools import combinations
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Tuple, Any
+from typing import Deque, Dict, List, Set, Optional, Tuple, Any
 
 from .utils import (
     find_python_files,
     find_project_root,
     get_project_boundary,
-    run_git_command,
+    json_dumps,
+    json_loads,
+    read_json,
+    stream_git_command,
+    write_atomic,
+    write_json,
     Console
 )
 
+# Try to import numpy
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Accesses kept for temporal correlation
+MAX_ACCESS_HISTORY = 1000
+
+# Files accessed within this many seconds of each other are correlated
+TEMPORAL_WINDOW_SECONDS = 5 * 60
+
 
 @dataclass
 class HybridNode:
@@ -93,27 +116,69 @@ class HybridEdge:
         )
 
 
+def _field_defaults(cls) -> Dict[str, Any]:
+    """Default value of each dataclass field that has one."""
+    defaults = {}
+    for f in fields(cls):
+        if f.default is not MISSING:
+            defaults[f.name] = f.default
+        elif f.default_factory is not MISSING:
+            defaults[f.name] = f.default_factory()
+    return defaults
+
+
+_NODE_DEFAULTS = _field_defaults(HybridNode)
+_EDGE_DEFAULTS = _field_defaults(HybridEdge)
+
+
+def _non_default_fields(obj, defaults: Dict[str, Any]) -> dict:
+    """Fields of a flat dataclass instance whose values differ from the defaults."""
+    missing = MISSING
+    return {k: v for k, v in vars(obj).items() if defaults.get(k, missing) != v}
+
+
 @dataclass
 class HybridGraph:
     """The complete hybrid knowledge graph."""
     root: Path
     nodes: Dict[str, HybridNode] = field(default_factory=dict)
-    edges: Dict[str, HybridEdge] = field(default_factory=dict)  # "source|target" -> edge
+    edges: Dict[str, HybridEdge] = field(default_factory=dict)  # edge_key(a, b) -> edge
     
     # Indexes for fast lookup
     neighbors: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
     
     # Correlation data
-    access_history: List[Tuple[str, str]] = field(default_factory=list)  # (node_id, timestamp)
+    access_history: Deque[Tuple[str, float]] = field(
+        default_factory=lambda: deque(maxlen=MAX_ACCESS_HISTORY)
+    )  # (node_id, epoch seconds), oldest first
     comod_matrix: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
     
+    # node_id -> (lowercased name, lowercased path), filled by add_node
+    _search_index: Dict[str, Tuple[str, str]] = field(default_factory=dict, repr=False, compare=False)
+    
+    @staticmethod
+    def edge_key(a: str, b: str) -> str:
+        """Key for the undirected edge between a and b, the same either way round."""
+        return f"{a}|{b}" if a <= b else f"{b}|{a}"
+    
+    def get_edge(self, a: str, b: str) -> Optional[HybridEdge]:
+        """Get the edge between two nodes, regardless of direction."""
+        return self.edges.get(self.edge_key(a, b))
+    
     def add_node(self, node: HybridNode):
         """Add or update a node."""
+        # Ids and paths repeat across edges, neighbors and the comod matrix;
+        # interning shares one string and lets dict lookups match by identity
+        node.id = sys.intern(node.id)
+        node.path = sys.intern(node.path)
         self.nodes[node.id] = node
+        self._search_index[node.id] = (node.name.lower(), node.path.lower())
     
     def add_edge(self, source: str, target: str, relationship_type: str, weight: float = 1.0):
         """Add or update an edge."""
-        edge_id = f"{source}|{target}"
+        source = sys.intern(source)
+        target = sys.intern(target)
+        edge_id = self.edge_key(source, target)
         
         if edge_id not in self.edges:
             self.edges[edge_id] = HybridEdge(source=source, target=target)
@@ -140,23 +205,26 @@ class HybridGraph:
     
     def record_access(self, node_id: str):
         """Record file access for temporal correlation."""
-        timestamp = datetime.utcnow().isoformat() + 'Z'
-        self.access_history.append((node_id, timestamp))
-        
-        # Keep only recent history (last 1000 accesses)
-        if len(self.access_history) > 1000:
-            self.access_history = self.access_history[-1000:]
+        now = time.time()
         
         # Update node access stats
         if node_id in self.nodes:
-            self.nodes[node_id].last_accessed = timestamp
+            self.nodes[node_id].last_accessed = datetime.utcnow().isoformat() + 'Z'
             self.nodes[node_id].access_count += 1
         
-        # Create temporal edges for files accessed within 5 minutes
-        cutoff = (datetime.utcnow() - timedelta(minutes=5)).isoformat() + 'Z'
-        recent = [nid for nid, ts in self.access_history if ts > cutoff and nid != node_id]
+        # Create temporal edges for the last 5 other files accessed within
+        # the window, walking back from the newest entry
+        recent = []
+        for other_id, ts in reversed(self.access_history):
+            if now - ts > TEMPORAL_WINDOW_SECONDS or len(recent) == 5:
+                break
+            if other_id != node_id:
+                recent.append(other_id)
         
-        for other_id in recent[-5:]:  # Last 5 recent
+        # The deque drops the oldest entry once full
+        self.access_history.append((node_id, now))
+        
+        for other_id in reversed(recent):
             self.add_edge(node_id, other_id, 'accessed_together', weight=0.5)
     
     def record_comodification(self, files: List[str]):
@@ -171,6 +239,28 @@ class HybridGraph:
                 weight = min(1.0, count * 0.2)  # Cap at 5 co-modifications
                 self.add_edge(f1, f2, 'modified_together', weight=weight)
     
+    def record_comodifications(self, commits: List[List[str]]):
+        """
+        Record many commits at once.
+        
+        Gives the same matrix and edge weights as calling
+        record_comodification per commit, but pairs are counted up front and
+        each edge is touched once instead of once per commit.
+        """
+        pair_counts = Counter()
+        for files in commits:
+            pair_counts.update(combinations(sorted(set(files)), 2))
+        
+        for (f1, f2), count in pair_counts.items():
+            before = self.comod_matrix[f1][f2]
+            after = before + count
+            self.comod_matrix[f1][f2] = after
+            self.comod_matrix[f2][f1] = after
+            
+            # Sum of the per-commit weights min(1.0, n * 0.2) for n in before+1..after
+            weight = _comod_weight_total(after) - _comod_weight_total(before)
+            self.add_edge(f1, f2, 'modified_together', weight=weight)
+    
     def get_related_nodes(self, query_id: str, limit: int = 10) -> List[Tuple[str, float]]:
         """Get nodes related to query, ranked by hybrid score."""
         if query_id not in self.nodes:
@@ -180,12 +270,8 @@ class HybridGraph:
         
         # Get direct neighbors
         for neighbor_id in self.neighbors.get(query_id, set()):
-            edge_id = f"{query_id}|{neighbor_id}"
-            if edge_id not in self.edges:
-                edge_id = f"{neighbor_id}|{query_id}"
-            
-            if edge_id in self.edges:
-                edge = self.edges[edge_id]
+            edge = self.get_edge(query_id, neighbor_id)
+            if edge:
                 scores[neighbor_id] = edge.get_combined_weight()
         
         # Sort by score
@@ -197,13 +283,16 @@ class HybridGraph:
         results = []
         query_lower = query.lower()
         
+        search_index = self._search_index
+        
         for node_id, node in self.nodes.items():
             score = 0.0
             
             # Name match boost
-            if query_lower in node.name.lower():
+            name_lower, path_lower = search_index.get(node_id) or (node.name.lower(), node.path.lower())
+            if query_lower in name_lower:
                 score += 0.5
-            if query_lower in node.path.lower():
+            if query_lower in path_lower:
                 score += 0.3
             
             # Add node's inherent scores
@@ -218,13 +307,20 @@ class HybridGraph:
         return results[:limit]
     
     def to_dict(self) -> dict:
-        """Serialize to dictionary."""
+        """
+        Serialize to dictionary.
+
+        Nodes and edges hold only flat fields, so they are read straight from
+        their instance dicts instead of being deep-copied by asdict, leaving
+        out fields still at their default (from_dict fills those back in).
+        The comod_matrix rows are plain dicts and are passed through as-is.
+        """
         return {
             'root': str(self.root),
-            'nodes': {k: asdict(v) for k, v in self.nodes.items()},
-            'edges': {k: asdict(v) for k, v in self.edges.items()},
+            'nodes': {k: _non_default_fields(v, _NODE_DEFAULTS) for k, v in self.nodes.items()},
+            'edges': {k: _non_default_fields(v, _EDGE_DEFAULTS) for k, v in self.edges.items()},
             'neighbors': {k: list(v) for k, v in self.neighbors.items()},
-            'comod_matrix': {k: dict(v) for k, v in self.comod_matrix.items()},
+            'comod_matrix': self.comod_matrix,
         }
     
     @classmethod
@@ -232,38 +328,123 @@ class HybridGraph:
         """Deserialize from dictionary."""
         graph = cls(root=Path(data['root']))
         
-        for k, v in data.get('nodes', {}).items():
-            graph.nodes[k] = HybridNode(**v)
+        intern = sys.intern
+        
+        for v in data.get('nodes', {}).values():
+            graph.add_node(HybridNode(**v))
         
-        for k, v in data.get('edges', {}).items():
-            graph.edges[k] = HybridEdge(**v)
+        for v in data.get('edges', {}).values():
+            edge = HybridEdge(**v)
+            edge.source = intern(edge.source)
+            edge.target = intern(edge.target)
+            key = cls.edge_key(edge.source, edge.target)
+            existing = graph.edges.get(key)
+            if existing is None:
+                graph.edges[key] = edge
+            else:
+                # Older files stored each direction separately; fold them together
+                existing.structural_weight = max(existing.structural_weight, edge.structural_weight)
+                existing.temporal_weight = max(existing.temporal_weight, edge.temporal_weight)
+                existing.comod_weight = max(existing.comod_weight, edge.comod_weight)
+                existing.semantic_weight = max(existing.semantic_weight, edge.semantic_weight)
+                for rt in edge.relationship_types:
+                    if rt not in existing.relationship_types:
+                        existing.relationship_types.append(rt)
+                existing.last_updated = max(existing.last_updated, edge.last_updated)
         
-        for k, v in data.get('neighbors', {}).items():
-            graph.neighbors[k] = set(v)
+        if 'neighbors' in data:
+            for k, v in data['neighbors'].items():
+                graph.neighbors[intern(k)] = set(map(intern, v))
+        else:
+            # Sharded saves leave neighbors out; they are the edge endpoints
+            for edge in graph.edges.values():
+                graph.neighbors[edge.source].add(edge.target)
+                graph.neighbors[edge.target].add(edge.source)
         
         for k, v in data.get('comod_matrix', {}).items():
-            graph.comod_matrix[k] = defaultdict(int, v)
+            graph.comod_matrix[intern(k)] = defaultdict(int, {intern(f): c for f, c in v.items()})
         
         return graph
 
 
+def _comod_weight_total(count: int) -> float:
+    """Total of min(1.0, n * 0.2) for n = 1..count."""
+    if count <= 5:
+        return 0.1 * count * (count + 1)
+    return 3.0 + (count - 5)
+
+
+# Graph sections stored as separate files in the graph directory
+GRAPH_SHARDS = {
+    'nodes': 'nodes.json',
+    'edges': 'edges.json',
+    'comod_matrix': 'comod.json',
+}
+
+
 def get_hybrid_graph_path(root: Path) -> Path:
-    """Get path to hybrid graph file."""
+    """Get path to the legacy single-file hybrid graph."""
     return root / '.mcp' / 'hybrid_graph.json'
 
 
-def load_hybrid_graph(root: Path = None) -> Optional[HybridGraph]:
-    """Load hybrid graph from disk."""
+def get_hybrid_graph_dir(root: Path) -> Path:
+    """Get path to the sharded hybrid graph directory."""
+    return root / '.mcp' / 'hybrid_graph'
+
+
+def load_hybrid_graph_meta(root: Path = None) -> Optional[dict]:
+    """
+    Load only the graph summary: root, node and edge counts, edge types.
+    
+    Cheap compared to a full load, since no shard is read.
+    """
     if root is None:
         root = get_project_boundary() or find_project_root() or Path.cwd()
     
+    meta_path = get_hybrid_graph_dir(root) / 'meta.json'
+    if meta_path.exists():
+        try:
+            return read_json(meta_path)
+        except Exception as e:
+            Console.warn(f"Could not load hybrid graph: {e}")
+    return None
+
+
+def load_hybrid_graph(root: Path = None, parts: Tuple[str, ...] = None) -> Optional[HybridGraph]:
+    """
+    Load hybrid graph from disk.
+    
+    Args:
+        root: Project root
+        parts: Sections of GRAPH_SHARDS to read, default all. Sections not
+            listed are left empty, so callers only pay for what they use.
+    """
+    if root is None:
+        root = get_project_boundary() or find_project_root() or Path.cwd()
+    
+    meta = load_hybrid_graph_meta(root)
+    if meta is not None:
+        graph_dir = get_hybrid_graph_dir(root)
+        try:
+            checksums = meta.get('checksums', {})
+            data = {'root': meta['root']}
+            for part in parts or GRAPH_SHARDS:
+                raw = (graph_dir / GRAPH_SHARDS[part]).read_bytes()
+                # A shard from a different save than meta is caught before parsing
+                if part in checksums and zlib.crc32(raw) != checksums[part]:
+                    raise ValueError(f"checksum mismatch in {GRAPH_SHARDS[part]}")
+                data[part] = json_loads(raw)
+            return HybridGraph.from_dict(data)
+        except Exception as e:
+            Console.warn(f"Could not load hybrid graph: {e}")
+        return None
+    
+    # Graphs saved before sharding live in a single file
     graph_path = get_hybrid_graph_path(root)
     
     if graph_path.exists():
         try:
-            with open(graph_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return HybridGraph.from_dict(data)
+            return HybridGraph.from_dict(read_json(graph_path))
         except Exception as e:
             Console.warn(f"Could not load hybrid graph: {e}")
     
@@ -271,14 +452,98 @@ def load_hybrid_graph(root: Path = None) -> Optional[HybridGraph]:
 
 
 def save_hybrid_graph(graph: HybridGraph):
-    """Save hybrid graph to disk."""
-    graph_path = get_hybrid_graph_path(graph.root)
-    graph_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(graph_path, 'w', encoding='utf-8') as f:
-        json.dump(graph.to_dict(), f, indent=2)
+    """Save hybrid graph to disk, one file per section plus a summary."""
+    graph_dir = get_hybrid_graph_dir(graph.root)
+    data = graph.to_dict()
+    
+    checksums = {}
+    for part, filename in GRAPH_SHARDS.items():
+        payload = json_dumps(data[part])
+        write_atomic(graph_dir / filename, payload)
+        checksums[part] = zlib.crc32(payload)
+    
+    edge_types = Counter(rt for edge in graph.edges.values() for rt in edge.relationship_types)
+    
+    # Written last, so the shards are complete once meta points at them
+    write_json(graph_dir / 'meta.json', {
+        'root': data['root'],
+        'node_count': len(graph.nodes),
+        'edge_count': len(graph.edges),
+        'edge_types': dict(edge_types),
+        'checksums': checksums,
+    })
+    
+    # Drop the pre-sharding file so it cannot shadow a later failed save
+    get_hybrid_graph_path(graph.root).unlink(missing_ok=True)
+    
+    Console.ok(f"Saved hybrid graph to {graph_dir}")
+
+
+# Marks the start of each commit in git log output
+_COMMIT_MARK = b'\x1e'
+_COMMIT_MARK_FORMAT = '%x1e'
+
+
+def _score_nodes(graph: HybridGraph):
+    """
+    Set structural and comod scores on every node.
     
-    Console.ok(f"Saved hybrid graph to {graph_path}")
+    Structural score grows with the number of connections, comod score with
+    the number of co-modifications. The clamping and scaling run as numpy
+    array operations when numpy is available.
+    """
+    node_ids = list(graph.nodes)
+    neighbors = graph.neighbors
+    comod_matrix = graph.comod_matrix
+    neighbor_counts = [len(neighbors.get(node_id, ())) for node_id in node_ids]
+    comod_totals = [sum(comod_matrix[node_id].values()) if node_id in comod_matrix else 0 for node_id in node_ids]
+    
+    if NUMPY_AVAILABLE:
+        structural_scores = np.minimum(1.0, np.array(neighbor_counts, dtype=np.float64) * 0.1).tolist()
+        comod_scores = np.minimum(1.0, np.array(comod_totals, dtype=np.float64) * 0.05).tolist()
+    else:
+        structural_scores = [min(1.0, n * 0.1) for n in neighbor_counts]
+        comod_scores = [min(1.0, n * 0.05) for n in comod_totals]
+    
+    for node_id, structural, comod in zip(node_ids, structural_scores, comod_scores):
+        node = graph.nodes[node_id]
+        node.structural_score = structural
+        node.comod_score = comod
+
+
+def _read_comod_commits(root: Path) -> List[List[str]]:
+    """Absolute .py paths of each recent commit that touched more than one."""
+    # Stream the log as NUL-separated bytes: each commit is a bare marker
+    # record followed by the paths it touched (the first one
+    # newline-prefixed), so filenames need no quoting or line heuristics
+    comod_commits = []
+    files_in_commit = None
+    
+    def finish_commit():
+        if files_in_commit and len(files_in_commit) > 1:
+            comod_commits.append(files_in_commit)
+    
+    for record in stream_git_command(
+        ['log', '-z', '--name-only', f'--format={_COMMIT_MARK_FORMAT}', '-n', '100'],
+        cwd=root,
+        sep=b'\0'
+    ):
+        record = record.lstrip(b'\n')
+        if record == _COMMIT_MARK:
+            finish_commit()
+            files_in_commit = []
+        elif record.endswith(b'.py') and files_in_commit is not None:
+            path = record.decode('utf-8', errors='replace')
+            files_in_commit.append(sys.intern(str(root / path)))
+    finish_commit()
+    
+    return comod_commits
+
+
+def _load_call_graph(root: Path):
+    """Load the saved call graph, if any."""
+    from .call_graph import load_call_graph
+    return load_call_graph(root)
 
 
 def build_hybrid_graph(root: Path = None) -> HybridGraph:
@@ -289,79 +554,59 @@ def build_hybrid_graph(root: Path = None) -> HybridGraph:
     
     graph = HybridGraph(root=root)
     
-    # 1. Add file nodes
-    files = list(find_python_files(root))
-    Console.info(f"Found {len(files)} files")
-    
-    for path in files:
-        node_id = str(path)
-        try:
-            relative = path.relative_to(root)
-        except ValueError:
-            relative = path
+    # The file walk, call graph load and git log don't depend on each other,
+    # so they run side by side; the graph itself is only touched here
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        files_future = executor.submit(lambda: list(find_python_files(root)))
+        call_graph_future = executor.submit(_load_call_graph, root)
+        commits_future = executor.submit(_read_comod_commits, root)
         
-        graph.add_node(HybridNode(
-            id=node_id,
-            node_type='file',
-            path=str(path),
-            name=path.name
-        ))
-    
-    # 2. Add structural edges from call graph
-    try:
-        from .call_graph import load_call_graph
-        call_graph = load_call_graph(root)
+        # 1. Add file nodes
+        files = files_future.result()
+        Console.info(f"Found {len(files)} files")
         
-        if call_graph:
-            for edge in call_graph.edges:
-                # Map to file-level edges
-                source_node = call_graph.nodes.get(edge.source)
-                target_node = call_graph.nodes.get(edge.target)
-                
-                if source_node and target_node:
-                    source_file = source_node.file
-                    target_file = target_node.file
-                    
-                    if source_file != target_file:
-                        graph.add_edge(source_file, target_file, edge.edge_type, weight=1.0)
-            
-            Console.info(f"Added {len(call_graph.edges)} structural edges")
-    except Exception as e:
-        Console.warn(f"Could not load call graph: {e}")
-    
-    # 3. Add co-modification from git history
-    try:
-        # Get commits with file lists
-        output = run_git_command(
-            ['log', '--name-only', '--format=%H', '-n', '100'],
-            cwd=root
-        )
+        for path in files:
+            node_id = sys.intern(str(path))
+            graph.add_node(HybridNode(
+                id=node_id,
+                node_type='file',
+                path=node_id,
+                name=path.name
+            ))
         
-        if output:
-            commits = output.strip().split('\n\n')
-            comod_count = 0
+        # 2. Add structural edges from call graph
+        try:
+            call_graph = call_graph_future.result()
             
-            for commit_block in commits:
-                lines = commit_block.strip().split('\n')
-                if len(lines) > 1:
-                    files_in_commit = [str(root / f) for f in lines[1:] if f.endswith('.py')]
-                    if len(files_in_commit) > 1:
-                        graph.record_comodification(files_in_commit)
-                        comod_count += 1
+            if call_graph:
+                for edge in call_graph.edges:
+                    # Map to file-level edges
+                    source_node = call_graph.nodes.get(edge.source)
+                    target_node = call_graph.nodes.get(edge.target)
+                    
+                    if source_node and target_node:
+                        source_file = source_node.file
+                        target_file = target_node.file
+                        
+                        if source_file != target_file:
+                            graph.add_edge(source_file, target_file, edge.edge_type, weight=1.0)
+                
+                Console.info(f"Added {len(call_graph.edges)} structural edges")
+        except Exception as e:
+            Console.warn(f"Could not load call graph: {e}")
+        
+        # 3. Add co-modification from git history
+        try:
+            comod_commits = commits_future.result()
             
-            Console.info(f"Processed {comod_count} commits for co-modification")
-    except Exception as e:
-        Console.warn(f"Could not analyze git history: {e}")
+            if comod_commits:
+                graph.record_comodifications(comod_commits)
+                Console.info(f"Processed {len(comod_commits)} commits for co-modification")
+        except Exception as e:
+            Console.warn(f"Could not analyze git history: {e}")
     
     # 4. Calculate node scores
-    for node_id, node in graph.nodes.items():
-        # Structural score: based on number of connections
-        neighbor_count = len(graph.neighbors.get(node_id, set()))
-        node.structural_score = min(1.0, neighbor_count * 0.1)
-        
-        # Comod score: based on co-modification count
-        comod_total = sum(graph.comod_matrix.get(node_id, {}).values())
-        node.comod_score = min(1.0, comod_total * 0.05)
+    _score_nodes(graph)
     
     Console.ok(f"Built graph: {len(graph.nodes)} nodes, {len(graph.edges)} edges")
     
@@ -388,10 +633,11 @@ def hybrid_search(query: str, root: Path = None, limit: int = 10) -> List[Tuple[
     # Format results
     formatted = []
     for node, score in results:
-        # Get relationship types from edges
+        # Get relationship types from the node's own edges
         rel_types = set()
-        for edge_id, edge in graph.edges.items():
-            if node.id in edge_id:
+        for neighbor_id in graph.neighbors.get(node.id, ()):
+            edge = graph.get_edge(node.id, neighbor_id)
+            if edge:
                 rel_types.update(edge.relationship_types)
         
         formatted.append((node.path, score, list(rel_types)))
@@ -432,19 +678,23 @@ def main():
     
     # Show stats
     if '--stats' in sys.argv:
-        graph = load_hybrid_graph(root)
-        if graph:
-            print(f"Nodes: {len(graph.nodes)}")
-            print(f"Edges: {len(graph.edges)}")
+        meta = load_hybrid_graph_meta(root)
+        if meta is None:
+            # Pre-sharding graph: count from the full load
+            graph = load_hybrid_graph(root)
+            if graph:
+                meta = {
+                    'node_count': len(graph.nodes),
+                    'edge_count': len(graph.edges),
+                    'edge_types': Counter(rt for edge in graph.edges.values() for rt in edge.relationship_types),
+                }
+        if meta:
+            print(f"Nodes: {meta['node_count']}")
+            print(f"Edges: {meta['edge_count']}")
             
             # Edge type breakdown
-            type_counts = defaultdict(int)
-            for edge in graph.edges.values():
-                for rt in edge.relationship_types:
-                    type_counts[rt] += 1
-            
             print("\nEdge types:")
-            for rt, count in sorted(type_counts.items()):
+            for rt, count in sorted(meta['edge_types'].items()):
                 print(f"  {rt}: {count}")
         else:
             Console.warn("No graph found. Run with --build first.")
@@ -452,23 +702,19 @@ def main():
     
     # Correlate (show co-modification patterns)
     if '--correlate' in sys.argv or 'correlate' in args:
-        graph = load_hybrid_graph(root)
+        graph = load_hybrid_graph(root, parts=('comod_matrix',))
         if graph:
             print("# Top Co-Modified Files\n")
             
-            # Flatten and sort comod matrix
-            pairs = []
-            seen = set()
-            for f1, others in graph.comod_matrix.items():
-                for f2, count in others.items():
-                    key = tuple(sorted([f1, f2]))
-                    if key not in seen:
-                        seen.add(key)
-                        pairs.append((f1, f2, count))
-            
-            pairs.sort(key=lambda x: x[2], reverse=True)
+            # The matrix is symmetric, so the upper triangle has every pair once
+            pairs = (
+                (f1, f2, count)
+                for f1, others in graph.comod_matrix.items()
+                for f2, count in others.items()
+                if f1 < f2
+            )
             
-            for f1, f2, count in pairs[:15]:
+            for f1, f2, count in heapq.nlargest(15, pairs, key=lambda x: x[2]):
                 print(f"- {Path(f1).name} <-> {Path(f2).name} ({count} times)")
         return 0
     
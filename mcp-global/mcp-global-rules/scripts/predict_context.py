@@ -9,20 +9,60 @@ instant context loading with zero latency.
 Usage:
     python mcp.py predict-context "implement user authentication"
     python mcp.py predict-context "fix bug in login flow"
+    MCP_DISABLE_VECTOR=1 python mcp.py predict-context "..."  # No semantic search
 """
 
+import functools
+import hashlib
+import heapq
+import os
+import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Set, Optional
+from typing import Callable, Iterable, Iterator, List, Dict, Set, Optional, Tuple
 
 from .utils import (
-    find_python_files,
     find_project_root,
     get_project_boundary,
+    read_json,
+    write_json,
     Console
 )
 
+# Try to import pyahocorasick
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Set MCP_DISABLE_VECTOR=1 to skip semantic search (and loading its model)
+VECTOR_DISABLED = os.environ.get('MCP_DISABLE_VECTOR', '') == '1'
+
+
+# The strategy modules are imported on first use only: vector_store pulls in
+# the embedding model stack, which dominates start-up when it is installed.
+@functools.lru_cache(maxsize=None)
+def _call_graph():
+    from . import call_graph
+    return call_graph
+
+
+@functools.lru_cache(maxsize=None)
+def _vector_store():
+    from . import vector_store
+    return vector_store
+
+
+@functools.lru_cache(maxsize=None)
+def _skeleton():
+    from . import skeleton
+    return skeleton
+
 
 @dataclass
 class PredictedContext:
@@ -35,121 +75,330 @@ class PredictedContext:
     confidence: float = 0.0
 
 
+# Common words to skip
+_SKIP_WORDS = frozenset({
+    'the', 'a', 'an', 'to', 'for', 'in', 'on', 'at', 'and', 'or', 'is',
+    'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
+    'might', 'must', 'shall', 'can', 'need', 'implement', 'fix', 'add',
+    'update', 'modify', 'change', 'create', 'delete', 'remove', 'bug',
+    'issue', 'problem', 'error', 'make', 'get', 'set', 'with', 'from'
+})
+
+# Deletes every ASCII character that is not alphanumeric or '_'
+_CLEAN_TABLE = str.maketrans('', '', ''.join(
+    chr(c) for c in range(128) if not (chr(c).isalnum() or chr(c) == '_')
+))
+
+
 def extract_task_keywords(task: str) -> List[str]:
     """Extract meaningful keywords from task description."""
-    # Common words to skip
-    skip_words = {
-        'the', 'a', 'an', 'to', 'for', 'in', 'on', 'at', 'and', 'or', 'is',
-        'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-        'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
-        'might', 'must', 'shall', 'can', 'need', 'implement', 'fix', 'add',
-        'update', 'modify', 'change', 'create', 'delete', 'remove', 'bug',
-        'issue', 'problem', 'error', 'make', 'get', 'set', 'with', 'from'
-    }
-    
-    words = task.lower().split()
     keywords = []
     
-    for word in words:
+    for word in task.lower().split():
         # Clean word
-        clean = ''.join(c for c in word if c.isalnum() or c == '_')
-        if len(clean) > 2 and clean not in skip_words:
+        clean = word.translate(_CLEAN_TABLE)
+        if not clean.isascii():
+            clean = ''.join(c for c in clean if c.isalnum() or c == '_')
+        if len(clean) > 2 and clean not in _SKIP_WORDS:
             keywords.append(clean)
     
     return keywords[:10]  # Limit to 10 keywords
 
 
-def predict_files_from_graph(keywords: List[str], root: Path) -> Set[str]:
-    """Use call graph to find related files."""
-    related = set()
+def predict_files_from_graph(keywords: List[str], root: Path) -> Dict[str, float]:
+    """Use call graph to find related files, scored by matching keywords."""
+    related: Dict[str, float] = {}
     
     try:
-        from .call_graph import load_call_graph, query_graph
-        graph = load_call_graph(root)
+        call_graph = _call_graph()
+        graph = call_graph.load_call_graph(root)
         
         if graph:
             for keyword in keywords:
-                result = query_graph(graph, keyword)
-                related.update(result.get('related_files', []))
+                result = call_graph.query_graph(graph, keyword)
+                for path in set(result.get('related_files', [])):
+                    related[path] = related.get(path, 0.0) + 1.0
     except Exception:
         pass
     
     return related
 
 
-def predict_files_from_search(keywords: List[str], root: Path) -> Set[str]:
-    """Use semantic search to find related files."""
-    related = set()
+# Query embeddings are reused across runs for this long
+QUERY_EMBED_TTL_SECONDS = 7 * 24 * 3600
+MAX_QUERY_EMBEDS = 256
+
+
+def get_query_embed_cache_path(root: Path) -> Path:
+    """Get path to the query embedding cache."""
+    return root / '.mcp' / 'query_embed_cache.json'
+
+
+def _embed_query(query: str, root: Path) -> Optional[List[float]]:
+    """
+    Embed a search query, reusing embeddings from earlier runs.
+    
+    Only model embeddings are cached: a hit skips loading the model at all.
+    The hashing fallback is cheap and seeded per process, so it is never
+    stored.
+    """
+    from .embeddings import embed_text, get_model, is_transformers_available
+    
+    if not is_transformers_available():
+        return embed_text(query)
     
+    cache_path = get_query_embed_cache_path(root)
     try:
-        from .vector_store import VectorStore
-        store = VectorStore()
+        cache = read_json(cache_path)
+    except (OSError, ValueError):
+        cache = {}
+    
+    now = time.time()
+    key = hashlib.sha256(query.encode('utf-8')).hexdigest()
+    entry = cache.get(key)
+    if entry and now - entry['time'] < QUERY_EMBED_TTL_SECONDS:
+        return entry['embedding']
+    
+    embedding = embed_text(query)
+    if embedding is None or get_model() is None:
+        return embedding
+    
+    # Drop expired entries, then the oldest while over the cap
+    cache = {k: v for k, v in cache.items() if now - v['time'] < QUERY_EMBED_TTL_SECONDS and k != key}
+    cache[key] = {'embedding': embedding, 'time': now}
+    for stale in list(cache)[:max(0, len(cache) - MAX_QUERY_EMBEDS)]:
+        del cache[stale]
+    
+    try:
+        write_json(cache_path, cache)
+    except OSError:
+        pass
+    
+    return embedding
+
+
+def predict_files_from_search(keywords: List[str], root: Path) -> Dict[str, float]:
+    """Use semantic search to find related files, scored by best similarity."""
+    related: Dict[str, float] = {}
+    
+    # Without an index there is nothing to search: don't import the stack
+    index_path = root / '.mcp' / 'vector_index'
+    if VECTOR_DISABLED or not (index_path / 'chunks.json').exists():
+        return related
+    
+    try:
+        store = _vector_store().VectorStore(index_path)
+        if not store.load():
+            return related
         
-        query = ' '.join(keywords)
-        results = store.search(query, limit=10)
+        query_emb = _embed_query(' '.join(keywords), root)
+        if query_emb is None:
+            return related
         
-        for result in results:
-            if hasattr(result, 'file'):
-                related.add(result.file)
+        for result in store.search_with_embedding(query_emb, k=10):
+            path = result.chunk.path
+            related[path] = max(related.get(path, 0.0), result.score)
     except Exception:
         pass
     
     return related
 
 
-def predict_files_from_names(keywords: List[str], root: Path) -> Set[str]:
-    """Find files with matching names."""
-    related = set()
+# Directory names never descended into when matching file names; the
+# find_python_files defaults plus .mcp
+_PRUNED_DIRS = frozenset({
+    '.git', '.venv', 'venv', 'node_modules', '__pycache__', '.mcp', 'dist',
+    'build', '.eggs', '.tox', '.pytest_cache'
+})
+
+
+def _walk_py(root: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (path, name) for Python files under root, pruning _PRUNED_DIRS.
     
-    for path in find_python_files(root):
-        name_lower = path.name.lower()
-        stem_lower = path.stem.lower()
-        
+    Unlike find_python_files, excluded trees are never listed at all, and
+    paths are built the way Path would print them.
+    """
+    stack = [root]
+    while stack:
+        top = stack.pop()
+        prefix = '' if top == '.' else top.rstrip(os.sep) + os.sep
+        try:
+            with os.scandir(top) as it:
+                for entry in it:
+                    name = entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if name not in _PRUNED_DIRS and not name.endswith('.egg-info'):
+                            stack.append(prefix + name)
+                    elif name.endswith('.py'):
+                        yield prefix + name, name
+        except OSError:
+            continue
+
+
+@functools.lru_cache(maxsize=8)
+def _list_py_files(root: str, root_mtime_ns: int) -> Tuple[Tuple[str, str], ...]:
+    """
+    (path, lowercased name) for every Python file under root.
+    
+    Cached per root; the root's mtime is part of the key so adding or
+    removing top-level entries forces a fresh walk.
+    """
+    return tuple((path, name.lower()) for path, name in _walk_py(str(Path(root))))
+
+
+def _keyword_matcher(keywords: List[str]) -> Callable[[str], bool]:
+    """
+    Build a test for whether a string contains any of the keywords.
+    
+    Each string is scanned once, whatever the number of keywords: with an
+    Aho-Corasick automaton when pyahocorasick is installed, otherwise with
+    a compiled regex alternation.
+    """
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
         for keyword in keywords:
-            if keyword in name_lower or keyword in stem_lower:
-                related.add(str(path))
-                break
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text), None) is not None
     
-    return related
+    search = re.compile('|'.join(map(re.escape, keywords))).search
+    return lambda text: search(text) is not None
+
+
+def predict_files_from_names(keywords: List[str], root: Path) -> Dict[str, float]:
+    """Find files with matching names (every match scores 1.0)."""
+    if not keywords:
+        return {}
+    
+    try:
+        root_mtime_ns = os.stat(root).st_mtime_ns
+    except OSError:
+        return {}
+    
+    matches = _keyword_matcher(keywords)
+    return {path: 1.0 for path, name_lower in _list_py_files(str(root), root_mtime_ns) if matches(name_lower)}
+
+
+# How much each strategy counts towards a file's fused score
+STRATEGY_WEIGHTS = {'graph': 0.5, 'search': 0.3, 'name': 0.2}
+
+# Bit set in a file's source mask for each strategy that found it
+SOURCE_BITS = {'graph': 1, 'search': 2, 'name': 4}
+
+
+def fuse_scores(sources: Dict[str, Dict[str, float]]) -> Tuple[Dict[str, float], Dict[str, int]]:
+    """
+    Combine per-strategy file scores into one weighted score.
+    
+    Each strategy's scores are divided by its best score first, so a
+    file's fused score is the weighted sum of values in [0, 1] and files
+    found by several strategies rank above single-source matches.
+    
+    Returns the fused scores and, per file, a mask of SOURCE_BITS.
+    """
+    fused: Dict[str, float] = {}
+    source_mask: Dict[str, int] = {}
+    
+    for source, scores in sources.items():
+        bit = SOURCE_BITS[source]
+        best = max(scores.values(), default=0.0)
+        weight = STRATEGY_WEIGHTS[source] / best if best > 0 else 0.0
+        for path, score in scores.items():
+            fused[path] = fused.get(path, 0.0) + weight * score
+            source_mask[path] = source_mask.get(path, 0) | bit
+    
+    return fused, source_mask
+
+
+# Directories (relative to root) searched for tests, in lookup order
+_TEST_DIRS = ('', 'tests', 'test')
+
+
+@functools.lru_cache(maxsize=8)
+def _test_index(root: str, dir_mtimes: Tuple[int, ...]) -> Dict[str, str]:
+    """
+    Map 'dir/filename' to the full path of each .py file in the test dirs.
+    
+    One scandir per directory replaces a stat per candidate name. The
+    directories' mtimes are part of the cache key, so adding or removing
+    a test refreshes it.
+    """
+    index = {}
+    for rel_dir in _TEST_DIRS:
+        directory = os.path.join(root, rel_dir) if rel_dir else root
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.endswith('.py') and entry.is_file():
+                        key = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                        index[key] = str(Path(root) / key)
+        except OSError:
+            continue
+    return index
 
 
 def find_related_tests(files: Set[str], root: Path) -> List[str]:
     """Find test files related to predicted files."""
     tests = []
     
+    dir_mtimes = []
+    for rel_dir in _TEST_DIRS:
+        try:
+            dir_mtimes.append(os.stat(root / rel_dir).st_mtime_ns)
+        except OSError:
+            dir_mtimes.append(0)
+    index = _test_index(str(root), tuple(dir_mtimes))
+    
     for file_path in files:
-        path = Path(file_path)
+        stem = Path(file_path).stem
         # Look for test_<name>.py or <name>_test.py
         test_patterns = [
-            f"test_{path.stem}.py",
-            f"{path.stem}_test.py",
-            f"tests/test_{path.stem}.py",
-            f"test/test_{path.stem}.py"
+            f"test_{stem}.py",
+            f"{stem}_test.py",
+            f"tests/test_{stem}.py",
+            f"test/test_{stem}.py"
         ]
         
         for pattern in test_patterns:
-            test_path = root / pattern
-            if test_path.exists():
-                tests.append(str(test_path))
+            test_path = index.get(pattern)
+            if test_path:
+                tests.append(test_path)
                 break
     
     return tests
 
 
-def generate_skeleton_snippets(files: Set[str], max_per_file: int = 500) -> Dict[str, str]:
+def _skeleton_snippet(file_path: str, max_per_file: int) -> Optional[str]:
+    """Format one file's skeleton, cut to max_per_file characters."""
+    skeleton_module = _skeleton()
+    
+    skeleton = skeleton_module.generate_file_skeleton(Path(file_path))
+    if not skeleton:
+        return None
+    return skeleton_module.format_file_skeleton(skeleton, include_imports=False)[:max_per_file]
+
+
+def generate_skeleton_snippets(files: Iterable[str], max_per_file: int = 500) -> Dict[str, str]:
     """Generate skeleton snippets for predicted files."""
     snippets = {}
     
+    # Limit to 10 files. Parsed serially: starting a process pool costs
+    # more than parsing this few files (skeleton pools from 64 files up)
+    paths = islice(
+        (f for f in files if f.endswith('.py') and os.path.exists(f)), 10
+    )
+    
     try:
-        from .skeleton import generate_file_skeleton, format_file_skeleton
-        
-        for file_path in list(files)[:10]:  # Limit to 10 files
-            path = Path(file_path)
-            if path.exists() and path.suffix == '.py':
-                skeleton = generate_file_skeleton(path)
-                if skeleton:
-                    formatted = format_file_skeleton(skeleton, include_imports=False)
-                    snippets[file_path] = formatted[:max_per_file]
+        for file_path in paths:
+            snippet = _skeleton_snippet(file_path, max_per_file)
+            if snippet:
+                snippets[file_path] = snippet
     except Exception:
         pass
     
@@ -174,38 +423,48 @@ def predict_context(task: str, root: Path = None) -> PredictedContext:
     keywords = extract_task_keywords(task)
     Console.info(f"Keywords: {', '.join(keywords)}")
     
-    # Gather predictions from multiple sources
-    all_files: Set[str] = set()
-    
-    # Method 1: Call graph (highest confidence)
-    graph_files = predict_files_from_graph(keywords, root)
-    all_files.update(graph_files)
+    # Gather predictions from multiple sources. They share nothing until the
+    # scores are fused and mostly wait on disk, so they run side by side.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        # Method 1: Call graph (highest confidence)
+        graph_future = executor.submit(predict_files_from_graph, keywords, root)
+        # Method 2: Semantic search
+        search_future = executor.submit(predict_files_from_search, keywords, root)
+        # Method 3: Filename matching
+        name_future = executor.submit(predict_files_from_names, keywords, root)
+        
+        graph_files = graph_future.result()
+        search_files = search_future.result()
+        name_files = name_future.result()
     
-    # Method 2: Semantic search
-    search_files = predict_files_from_search(keywords, root)
-    all_files.update(search_files)
+    scores, source_mask = fuse_scores({'graph': graph_files, 'search': search_files, 'name': name_files})
+    all_files = set(scores)
     
-    # Method 3: Filename matching
-    name_files = predict_files_from_names(keywords, root)
-    all_files.update(name_files)
+    # Best 20 by fused score, ties by path
+    predicted_files = [path for path, _ in heapq.nsmallest(20, scores.items(), key=lambda kv: (-kv[1], kv[0]))]
     
     # Find related tests
     tests = find_related_tests(all_files, root)
     
-    # Generate skeletons
-    skeletons = generate_skeleton_snippets(all_files)
+    # Generate skeletons, for the highest ranked files first
+    skeletons = generate_skeleton_snippets(predicted_files)
     
     # Calculate confidence based on overlap
     confidence = 0.0
     if all_files:
-        overlap_count = len(graph_files & search_files) + len(graph_files & name_files)
+        # Graph agreement with search, plus graph agreement with names
+        graph, search, name = SOURCE_BITS['graph'], SOURCE_BITS['search'], SOURCE_BITS['name']
+        overlap_count = sum(
+            bool(mask & search) + bool(mask & name)
+            for mask in source_mask.values() if mask & graph
+        )
         confidence = min(0.9, 0.3 + (overlap_count * 0.1))
     
     Console.ok(f"Predicted {len(all_files)} files, {len(tests)} tests")
     
     return PredictedContext(
         task=task,
-        predicted_files=sorted(all_files)[:20],
+        predicted_files=predicted_files,
         predicted_functions=[],  # Could extract from skeletons
         skeleton_snippets=skeletons,
         related_tests=tests,
@@ -226,26 +485,20 @@ def format_predicted_context(ctx: PredictedContext) -> str:
     
     if ctx.predicted_files:
         lines.append("## Predicted Files")
-        for f in ctx.predicted_files[:10]:
-            lines.append(f"- `{f}`")
+        lines.extend(f"- `{f}`" for f in ctx.predicted_files[:10])
         if len(ctx.predicted_files) > 10:
             lines.append(f"- ... and {len(ctx.predicted_files) - 10} more")
         lines.append("")
     
     if ctx.related_tests:
         lines.append("## Related Tests")
-        for t in ctx.related_tests[:5]:
-            lines.append(f"- `{t}`")
+        lines.extend(f"- `{t}`" for t in ctx.related_tests[:5])
         lines.append("")
     
     if ctx.skeleton_snippets:
         lines.append("## Code Skeletons")
-        for path, skeleton in list(ctx.skeleton_snippets.items())[:5]:
-            lines.append(f"### {Path(path).name}")
-            lines.append("```python")
-            lines.append(skeleton)
-            lines.append("```")
-            lines.append("")
+        for path, skeleton in islice(ctx.skeleton_snippets.items(), 5):
+            lines.extend((f"### {Path(path).name}", "```python", skeleton, "```", ""))
     
     return '\n'.join(lines)
 
@@ -17,6 +17,7 @@ Usage:
 
 import json
 import sys
+from collections import OrderedDict
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from pathlib import Path
@@ -25,6 +26,11 @@ from typing import Dict, List, Optional, Any
 from .utils import (
     find_project_root,
     get_project_boundary,
+    json_dumps,
+    json_loads,
+    read_json,
+    write_atomic,
+    write_json,
     Console
 )
 
@@ -53,15 +59,28 @@ class ProjectState:
     last_updated: str = ""
     version: int = 1
     
+    # Bytes of the journal already replayed into this state (not saved)
+    _journal_offset: int = field(default=0, repr=False, compare=False)
+    _journal_entries: int = field(default=0, repr=False, compare=False)
+    
+    # Same lessons as lessons_learned, for O(1) duplicate checks (not saved)
+    _lessons_set: set = field(default_factory=set, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._lessons_set = set(self.lessons_learned)
+    
     def to_dict(self) -> dict:
         """Convert to dictionary."""
-        return asdict(self)
+        data = asdict(self)
+        for name in [k for k in data if k.startswith('_')]:
+            del data[name]
+        return data
     
     @classmethod
     def from_dict(cls, data: dict) -> 'ProjectState':
         """Create from dictionary."""
         # Handle missing fields gracefully
-        known_fields = {f.name for f in cls.__dataclass_fields__.values()}
+        known_fields = {f.name for f in cls.__dataclass_fields__.values() if not f.name.startswith('_')}
         filtered_data = {k: v for k, v in data.items() if k in known_fields}
         return cls(**filtered_data)
     
@@ -77,34 +96,152 @@ def get_state_path(root: Path = None) -> Path:
     return root / '.mcp' / 'project_state.json'
 
 
+def get_journal_path(root: Path = None) -> Path:
+    """Get path to the state change journal (appended to between saves)."""
+    return get_state_path(root).with_suffix('.jsonl')
+
+
+# Fold the journal into project_state.json once it holds this many changes
+_JOURNAL_COMPACT_ENTRIES = 100
+
+
 def load_state(root: Path = None) -> ProjectState:
-    """Load project state from disk."""
+    """Load project state from disk, replaying journaled changes."""
     state_path = get_state_path(root)
+    state = None
     
     if state_path.exists():
         try:
-            with open(state_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return ProjectState.from_dict(data)
+            state = ProjectState.from_dict(read_json(state_path))
         except Exception as e:
             Console.warn(f"Could not load state: {e}")
     
-    return ProjectState()
+    state = state or ProjectState()
+    _replay_journal(state, root)
+    return state
+
+
+def _replay_journal(state: ProjectState, root: Path = None, stop: Optional[int] = None):
+    """
+    Apply journal entries past state._journal_offset to state.
+    
+    Reads up to byte stop (default: the end of the file); an incomplete
+    last line is left for a later replay.
+    """
+    offset = state._journal_offset
+    try:
+        with open(get_journal_path(root), 'rb') as f:
+            f.seek(offset)
+            journal = f.read() if stop is None else f.read(max(stop - offset, 0))
+    except OSError:
+        return
+    
+    end = journal.rfind(b'\n') + 1
+    for line in journal[:end].splitlines():
+        try:
+            entry = json_loads(line)
+            apply_change(state, entry['op'], entry.get('val'))
+            state.version += 1
+            state.last_updated = entry.get('ts', state.last_updated)
+            state._journal_entries += 1
+        except Exception:
+            continue  # skip a corrupt entry rather than drop the journal
+    state._journal_offset = offset + end
 
 
 def save_state(state: ProjectState, root: Path = None):
-    """Save project state to disk."""
+    """Save project state to disk, folding in the replayed journal."""
     state_path = get_state_path(root)
-    state_path.parent.mkdir(parents=True, exist_ok=True)
     
+    state.version += 1
     state.update_timestamp()
     
-    with open(state_path, 'w', encoding='utf-8') as f:
-        json.dump(state.to_dict(), f, indent=2)
+    # Indented: the state file is meant to be read and edited by hand too
+    write_json(state_path, state.to_dict(), indent=True)
+    
+    if state._journal_offset:
+        # Keep anything appended after state last caught up with the journal
+        journal_path = get_journal_path(root)
+        try:
+            rest = journal_path.read_bytes()[state._journal_offset:]
+            if rest:
+                write_atomic(journal_path, rest)
+            else:
+                journal_path.unlink()
+        except OSError:
+            pass
+        state._journal_offset = 0
+        state._journal_entries = 0
     
     Console.ok(f"State saved to {state_path}")
 
 
+def apply_change(state: ProjectState, op: str, value: Optional[str] = None):
+    """Apply one state change; the same code runs live and on journal replay."""
+    if op == 'set_goal':
+        state.global_goal = value
+    elif op == 'set_task':
+        state.current_active_task = value
+    elif op == 'add_task':
+        state.next_step_queue.append(value)
+    elif op == 'complete':
+        if state.current_active_task:
+            state.completed_milestones.append(state.current_active_task)
+            # Move next task to current
+            state.current_active_task = state.next_step_queue.pop(0) if state.next_step_queue else ""
+    elif op == 'learn':
+        if value not in state._lessons_set:
+            state.lessons_learned.append(value)
+            state._lessons_set.add(value)
+    elif op == 'bug':
+        state.known_bugs.append(value)
+    else:
+        raise ValueError(f"Unknown state change: {op}")
+
+
+def record_change(state: ProjectState, op: str, value: Optional[str] = None,
+                  root: Path = None, compact: bool = False):
+    """
+    Apply a change to state and persist it.
+    
+    The change is appended to the journal as one line instead of
+    rewriting project_state.json; the journal is compacted into the state
+    file when asked to or once it holds _JOURNAL_COMPACT_ENTRIES changes.
+    """
+    # Pick up changes other processes journaled since state was loaded
+    _replay_journal(state, root)
+    
+    apply_change(state, op, value)
+    state.version += 1
+    state.update_timestamp()
+    
+    journal_path = get_journal_path(root)
+    journal_path.parent.mkdir(parents=True, exist_ok=True)
+    entry = {'op': op, 'ts': state.last_updated}
+    if value is not None:
+        entry['val'] = value
+    
+    line = json_dumps(entry) + b'\n'
+    with open(journal_path, 'ab') as f:
+        start = f.tell()
+        if start != state._journal_offset:
+            # Don't let a torn last line (a crashed writer) swallow this entry
+            line = b'\n' + line
+        f.write(line)
+        end = f.tell()
+    
+    if start != state._journal_offset:
+        # Entries appended since the catch-up above come before this one
+        _replay_journal(state, root, stop=start)
+    
+    # Count this entry as replayed, so a save folds it in
+    state._journal_offset = end
+    state._journal_entries += 1
+    
+    if compact or state._journal_entries >= _JOURNAL_COMPACT_ENTRIES:
+        save_state(state, root)
+
+
 def format_state(state: ProjectState) -> str:
     """Format state as readable markdown."""
     lines = [
@@ -132,8 +269,7 @@ def format_state(state: ProjectState) -> str:
         lines.extend([
             "## Next Steps",
         ])
-        for i, step in enumerate(state.next_step_queue[:10], 1):
-            lines.append(f"{i}. {step}")
+        lines.extend(f"{i}. {step}" for i, step in enumerate(state.next_step_queue[:10], 1))
         if len(state.next_step_queue) > 10:
             lines.append(f"... and {len(state.next_step_queue) - 10} more")
         lines.append("")
@@ -142,16 +278,14 @@ def format_state(state: ProjectState) -> str:
         lines.extend([
             "## Completed Milestones",
         ])
-        for milestone in state.completed_milestones[-10:]:
-            lines.append(f"- [x] {milestone}")
+        lines.extend(f"- [x] {milestone}" for milestone in state.completed_milestones[-10:])
         lines.append("")
     
     if state.known_bugs:
         lines.extend([
             "## Known Bugs",
         ])
-        for bug in state.known_bugs:
-            lines.append(f"- {bug}")
+        lines.extend(f"- {bug}" for bug in state.known_bugs)
         lines.append("")
     
     if state.lessons_learned:
@@ -161,13 +295,17 @@ def format_state(state: ProjectState) -> str:
             "*These are injected into AI agent context:*",
             "",
         ])
-        for lesson in state.lessons_learned:
-            lines.append(f"- {lesson}")
+        lines.extend(f"- {lesson}" for lesson in state.lessons_learned)
         lines.append("")
     
     return '\n'.join(lines)
 
 
+# Recent get_warm_context results by (version, last_updated, max_tokens)
+_WARM_CONTEXT_CACHE: 'OrderedDict[tuple, str]' = OrderedDict()
+_WARM_CONTEXT_CACHE_SIZE = 4
+
+
 def get_warm_context(state: ProjectState, max_tokens: int = 500) -> str:
     """
     Get state as warm context for AI agents.
@@ -175,6 +313,21 @@ def get_warm_context(state: ProjectState, max_tokens: int = 500) -> str:
     This is the "Tier 2" context that should be injected into
     every agent's context window.
     """
+    # Every save and recorded change bumps version or last_updated
+    key = (state.version, state.last_updated, max_tokens)
+    result = _WARM_CONTEXT_CACHE.get(key)
+    if result is None:
+        result = _format_warm_context(state, max_tokens)
+        _WARM_CONTEXT_CACHE[key] = result
+        if len(_WARM_CONTEXT_CACHE) > _WARM_CONTEXT_CACHE_SIZE:
+            _WARM_CONTEXT_CACHE.popitem(last=False)
+    else:
+        _WARM_CONTEXT_CACHE.move_to_end(key)
+    return result
+
+
+def _format_warm_context(state: ProjectState, max_tokens: int) -> str:
+    """Render the warm context (see get_warm_context)."""
     lines = [
         "# Project Context (Warm)",
         "",
@@ -194,8 +347,7 @@ def get_warm_context(state: ProjectState, max_tokens: int = 500) -> str:
     # Lessons learned are critical - always include
     if state.lessons_learned:
         lines.append("**Remember:**")
-        for lesson in state.lessons_learned[-10:]:  # Last 10 lessons
-            lines.append(f"- {lesson}")
+        lines.extend(f"- {lesson}" for lesson in state.lessons_learned[-10:])  # Last 10 lessons
     
     # Truncate if needed
     result = '\n'.join(lines)
@@ -219,41 +371,33 @@ def main():
     # Set global goal
     for i, arg in enumerate(args):
         if arg == '--set-goal' and i + 1 < len(args):
-            state.global_goal = args[i + 1]
-            save_state(state, root)
+            record_change(state, 'set_goal', args[i + 1], root)
             Console.ok(f"Set goal: {state.global_goal}")
             return 0
     
     # Set current task
     for i, arg in enumerate(args):
         if arg == '--set-task' and i + 1 < len(args):
-            state.current_active_task = args[i + 1]
-            save_state(state, root)
+            record_change(state, 'set_task', args[i + 1], root)
             Console.ok(f"Set task: {state.current_active_task}")
             return 0
     
     # Add to next steps queue
     for i, arg in enumerate(args):
         if arg == '--add-task' and i + 1 < len(args):
-            state.next_step_queue.append(args[i + 1])
-            save_state(state, root)
+            record_change(state, 'add_task', args[i + 1], root)
             Console.ok(f"Added task: {args[i + 1]}")
             return 0
     
     # Complete current task
     if '--complete' in args:
         if state.current_active_task:
-            state.completed_milestones.append(state.current_active_task)
             Console.ok(f"Completed: {state.current_active_task}")
             
-            # Move next task to current
-            if state.next_step_queue:
-                state.current_active_task = state.next_step_queue.pop(0)
+            # Milestones are a natural point to fold the journal in
+            record_change(state, 'complete', root=root, compact=True)
+            if state.current_active_task:
                 Console.info(f"New task: {state.current_active_task}")
-            else:
-                state.current_active_task = ""
-            
-            save_state(state, root)
         else:
             Console.warn("No current task to complete")
         return 0
@@ -262,9 +406,8 @@ def main():
     for i, arg in enumerate(args):
         if arg in ('--learn', '--lesson') and i + 1 < len(args):
             lesson = args[i + 1]
-            if lesson not in state.lessons_learned:
-                state.lessons_learned.append(lesson)
-                save_state(state, root)
+            if lesson not in state._lessons_set:
+                record_change(state, 'learn', lesson, root)
                 Console.ok(f"Learned: {lesson}")
             else:
                 Console.warn("Lesson already recorded")
@@ -273,8 +416,7 @@ def main():
     # Add known bug
     for i, arg in enumerate(args):
         if arg == '--bug' and i + 1 < len(args):
-            state.known_bugs.append(args[i + 1])
-            save_state(state, root)
+            record_change(state, 'bug', args[i + 1], root)
             Console.ok(f"Bug recorded: {args[i + 1]}")
             return 0
     
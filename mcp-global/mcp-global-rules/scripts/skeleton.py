@@ -15,20 +15,29 @@ Usage:
 """
 
 import ast
+import functools
+import os
+import re
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, Iterator, List, Optional, Any, Tuple
 
 from .utils import (
     find_python_files,
     find_project_root,
     get_project_boundary,
+    read_json,
+    write_json,
     Console
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class SkeletonItem:
     """A skeleton item (class, function, etc)."""
     name: str
@@ -41,7 +50,7 @@ class SkeletonItem:
     children: List['SkeletonItem'] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class FileSkeleton:
     """Skeleton of a single file."""
     path: Path
@@ -52,7 +61,7 @@ class FileSkeleton:
     skeleton_lines: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class CodebaseSkeleton:
     """Skeleton of entire codebase."""
     root: Path
@@ -62,11 +71,145 @@ class CodebaseSkeleton:
     compression_ratio: float = 0.0
 
 
-def get_decorator_string(decorator: ast.expr) -> str:
+def _fast_unparse(node: ast.AST) -> Optional[str]:
+    """
+    Render the commonest simple expressions without ast.unparse.
+    
+    Handles names, dotted names, None/bools/ints, plain strings and
+    negative ints exactly as ast.unparse would; returns None for anything
+    else. Strings whose repr needs a backslash are left to ast.unparse,
+    which picks quotes to avoid escapes, as are u'' strings (it keeps
+    the prefix).
+    """
+    kind = type(node)
+    if kind is ast.Name:
+        return node.id
+    if kind is ast.Constant:
+        value = node.value
+        if value is None or type(value) in (bool, int):
+            return repr(value)
+        if type(value) is str and node.kind is None:
+            text = repr(value)
+            return text if '\\' not in text else None
+        return None
+    if kind is ast.Attribute and type(node.value) in (ast.Name, ast.Attribute):
+        base = _fast_unparse(node.value)
+        return f'{base}.{node.attr}' if base is not None else None
+    if kind is ast.UnaryOp and type(node.op) is ast.USub:
+        operand = node.operand
+        if type(operand) is ast.Constant and type(operand.value) is int:
+            return f'-{operand.value}'
+    return None
+
+
+# ast.unparse is missing before Python 3.9; looked up once, not per node
+_unparse = getattr(ast, 'unparse', None)
+
+
+class _TooLong(Exception):
+    """Raised by _CappedUnparser once its output passes the limit."""
+
+
+if hasattr(ast, '_Unparser'):
+    class _CappedUnparser(ast._Unparser):  # private, but stable since 3.9
+        """
+        ast.unparse that gives up once the output passes limit characters.
+        
+        Only text reaching the top-level buffer counts: nested buffers
+        (f-string parts) are written into it again when they are done.
+        The unparser also builds nested copies of itself for f-string
+        expressions; those get no limit.
+        """
+        
+        def __init__(self, limit: Optional[int] = None, **kwargs):
+            super().__init__(**kwargs)
+            self._limit = limit
+            self._length = 0
+            self._root = None
+        
+        def visit(self, node):
+            self._source = self._root = []
+            self._length = 0
+            self.traverse(node)
+            return ''.join(self._source)
+        
+        def write(self, *text):
+            self._source.extend(text)
+            if self._limit is not None and self._source is self._root:
+                self._length += sum(map(len, text))
+                if self._length > self._limit:
+                    raise _TooLong
+else:
+    _CappedUnparser = None
+
+
+def _unparse_capped(node: ast.AST, limit: int) -> Optional[str]:
+    """ast.unparse(node), or None if the result is longer than limit."""
+    if _CappedUnparser is None:
+        text = _unparse(node)
+        return text if len(text) <= limit else None
+    try:
+        return _CappedUnparser(limit).visit(node)
+    except _TooLong:
+        return None
+
+
+class _UnparseCache:
+    """
+    Per-file memo of ast.unparse results, keyed by the node's source text.
+    
+    Annotations like Optional[str] repeat throughout a file as distinct
+    nodes, so node identity would never hit; identical source text always
+    parses to the same expression. Only single-line ASCII expressions are
+    keyed (AST column offsets count UTF-8 bytes), the rest are unparsed.
+    """
+    
+    __slots__ = ('lines', 'results')
+    
+    def __init__(self, source: str):
+        # ast also breaks lines at a lone '\r'; don't try to match that
+        self.lines = None if '\r' in source else source.split('\n')
+        self.results: Dict[str, str] = {}
+    
+    def unparse(self, node: ast.AST) -> str:
+        fast = _fast_unparse(node)
+        if fast is not None:
+            return fast
+        lines = self.lines
+        if lines is not None and node.lineno == node.end_lineno:
+            line = lines[node.lineno - 1]
+            if line.isascii():
+                key = line[node.col_offset:node.end_col_offset]
+                result = self.results.get(key)
+                if result is None:
+                    result = self.results[key] = _unparse(node)
+                return result
+        return _unparse(node)
+    
+    def unparse_short(self, node: ast.AST, limit: int) -> Optional[str]:
+        """Unparse node if it fits in limit characters, else None."""
+        fast = _fast_unparse(node)
+        if fast is not None:
+            return fast if len(fast) <= limit else None
+        # Long defaults (big dicts, lambdas) stop rendering at the limit
+        return _unparse_capped(node, limit)
+
+
+# Used when no per-file cache is passed: fast paths only, nothing kept
+_NO_CACHE = _UnparseCache('\r')
+
+
+@functools.lru_cache(maxsize=4096)
+def _decorator_string(text: str) -> str:
+    """'@' + text, shared: a codebase uses only a few distinct decorators."""
+    return sys.intern('@' + text)
+
+
+def get_decorator_string(decorator: ast.expr, cache: Optional[_UnparseCache] = None) -> str:
     """Convert decorator AST node to string."""
     try:
-        if hasattr(ast, 'unparse'):
-            return '@' + ast.unparse(decorator)
+        if _unparse is not None:
+            return _decorator_string((cache or _NO_CACHE).unparse(decorator))
         elif isinstance(decorator, ast.Name):
             return '@' + decorator.id
         elif isinstance(decorator, ast.Attribute):
@@ -81,25 +224,26 @@ def get_decorator_string(decorator: ast.expr) -> str:
         return '@...'
 
 
-def get_type_annotation_string(node: Optional[ast.expr]) -> str:
+def get_type_annotation_string(node: Optional[ast.expr], cache: Optional[_UnparseCache] = None) -> str:
     """Convert type annotation to string."""
     if node is None:
         return ''
     try:
-        if hasattr(ast, 'unparse'):
-            return ast.unparse(node)
+        if _unparse is not None:
+            return (cache or _NO_CACHE).unparse(node)
         elif isinstance(node, ast.Name):
             return node.id
         elif isinstance(node, ast.Constant):
             return repr(node.value)
         elif isinstance(node, ast.Subscript):
-            return f"{get_type_annotation_string(node.value)}[...]"
+            return f"{get_type_annotation_string(node.value, cache)}[...]"
         return '...'
     except Exception:
         return '...'
 
 
-def build_function_signature(node: ast.FunctionDef | ast.AsyncFunctionDef) -> str:
+def build_function_signature(node: ast.FunctionDef | ast.AsyncFunctionDef,
+                             cache: Optional[_UnparseCache] = None) -> str:
     """Build function signature string."""
     # Handle async
     prefix = 'async ' if isinstance(node, ast.AsyncFunctionDef) else ''
@@ -112,16 +256,16 @@ def build_function_signature(node: ast.FunctionDef | ast.AsyncFunctionDef) -> st
     for i, arg in enumerate(node.args.args):
         arg_str = arg.arg
         if arg.annotation:
-            arg_str += f': {get_type_annotation_string(arg.annotation)}'
+            arg_str += f': {get_type_annotation_string(arg.annotation, cache)}'
         
         # Check for default
         default_idx = i - defaults_offset
         if default_idx >= 0 and default_idx < len(node.args.defaults):
             try:
-                if hasattr(ast, 'unparse'):
-                    default_val = ast.unparse(node.args.defaults[default_idx])
+                if _unparse is not None:
+                    default_val = (cache or _NO_CACHE).unparse_short(node.args.defaults[default_idx], 20)
                     # Truncate long defaults
-                    if len(default_val) > 20:
+                    if default_val is None:
                         default_val = '...'
                     arg_str += f' = {default_val}'
                 else:
@@ -135,14 +279,14 @@ def build_function_signature(node: ast.FunctionDef | ast.AsyncFunctionDef) -> st
     if node.args.vararg:
         vararg_str = f'*{node.args.vararg.arg}'
         if node.args.vararg.annotation:
-            vararg_str += f': {get_type_annotation_string(node.args.vararg.annotation)}'
+            vararg_str += f': {get_type_annotation_string(node.args.vararg.annotation, cache)}'
         args_parts.append(vararg_str)
     
     # **kwargs
     if node.args.kwarg:
         kwarg_str = f'**{node.args.kwarg.arg}'
         if node.args.kwarg.annotation:
-            kwarg_str += f': {get_type_annotation_string(node.args.kwarg.annotation)}'
+            kwarg_str += f': {get_type_annotation_string(node.args.kwarg.annotation, cache)}'
         args_parts.append(kwarg_str)
     
     args_str = ', '.join(args_parts)
@@ -150,26 +294,27 @@ def build_function_signature(node: ast.FunctionDef | ast.AsyncFunctionDef) -> st
     # Return type
     return_str = ''
     if node.returns:
-        return_str = f' -> {get_type_annotation_string(node.returns)}'
+        return_str = f' -> {get_type_annotation_string(node.returns, cache)}'
     
     return f'{prefix}def {node.name}({args_str}){return_str}'
 
 
-def build_class_signature(node: ast.ClassDef) -> str:
+def build_class_signature(node: ast.ClassDef, cache: Optional[_UnparseCache] = None) -> str:
     """Build class signature string."""
     bases = []
     for base in node.bases:
-        bases.append(get_type_annotation_string(base))
+        bases.append(get_type_annotation_string(base, cache))
     
     if bases:
         return f'class {node.name}({", ".join(bases)})'
     return f'class {node.name}'
 
 
-def extract_function_skeleton(node: ast.FunctionDef | ast.AsyncFunctionDef) -> SkeletonItem:
+def extract_function_skeleton(node: ast.FunctionDef | ast.AsyncFunctionDef,
+                              cache: Optional[_UnparseCache] = None) -> SkeletonItem:
     """Extract skeleton from function."""
-    decorators = [get_decorator_string(d) for d in node.decorator_list]
-    signature = build_function_signature(node)
+    decorators = [get_decorator_string(d, cache) for d in node.decorator_list]
+    signature = build_function_signature(node, cache)
     docstring = ast.get_docstring(node)
     
     return SkeletonItem(
@@ -183,17 +328,17 @@ def extract_function_skeleton(node: ast.FunctionDef | ast.AsyncFunctionDef) -> S
     )
 
 
-def extract_class_skeleton(node: ast.ClassDef) -> SkeletonItem:
+def extract_class_skeleton(node: ast.ClassDef, cache: Optional[_UnparseCache] = None) -> SkeletonItem:
     """Extract skeleton from class."""
-    decorators = [get_decorator_string(d) for d in node.decorator_list]
-    signature = build_class_signature(node)
+    decorators = [get_decorator_string(d, cache) for d in node.decorator_list]
+    signature = build_class_signature(node, cache)
     docstring = ast.get_docstring(node)
     
     # Extract methods
     methods = []
     for item in node.body:
         if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            method = extract_function_skeleton(item)
+            method = extract_function_skeleton(item, cache)
             method.item_type = 'method'
             methods.append(method)
     
@@ -211,20 +356,50 @@ def extract_class_skeleton(node: ast.ClassDef) -> SkeletonItem:
 
 def generate_file_skeleton(path: Path) -> Optional[FileSkeleton]:
     """Generate skeleton for a single Python file."""
+    skeleton, warning = _generate_file_skeleton(path)
+    if warning:
+        Console.warn(warning)
+    return skeleton
+
+
+def _generate_file_skeleton(path: Path) -> Tuple[Optional[FileSkeleton], Optional[str]]:
+    """
+    Generate a file's skeleton, returning any warning instead of printing.
+    
+    Runs in worker processes, so warnings are printed by the caller.
+    """
+    source, warning = _read_source(path)
+    if source is None:
+        return None, warning
+    return _extract_file_skeleton(path, source)
+
+
+def _read_source(path: Path) -> Tuple[Optional[str], Optional[str]]:
+    """Read a file's source, returning (source, None) or (None, warning)."""
     try:
         with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-            source = f.read()
+            return f.read(), None
     except Exception as e:
-        Console.warn(f"Could not read {path}: {e}")
-        return None
-    
+        return None, f"Could not read {path}: {e}"
+
+
+# Matches a line holding anything besides whitespace and comments
+_CODE_LINE = re.compile(r'^[ \t\f]*[^\s#]', re.MULTILINE)
+
+
+def _extract_file_skeleton(path: Path, source: str) -> Tuple[Optional[FileSkeleton], Optional[str]]:
+    """Parse already read source into a skeleton (see _generate_file_skeleton)."""
     original_lines = source.count('\n') + 1
     
+    # Empty and comment-only files (often __init__.py) have nothing to
+    # extract; don't parse them
+    if not _CODE_LINE.search(source):
+        return FileSkeleton(path=path, module_docstring=None, original_lines=original_lines), None
+    
     try:
         tree = ast.parse(source, filename=str(path))
     except SyntaxError as e:
-        Console.warn(f"Syntax error in {path}: {e}")
-        return None
+        return None, f"Syntax error in {path}: {e}"
     
     skeleton = FileSkeleton(
         path=path,
@@ -232,35 +407,91 @@ def generate_file_skeleton(path: Path) -> Optional[FileSkeleton]:
         original_lines=original_lines
     )
     
-    # Extract imports
-    for node in tree.body:
-        if isinstance(node, ast.Import):
-            for alias in node.names:
-                skeleton.imports.append(f'import {alias.name}')
-        elif isinstance(node, ast.ImportFrom):
-            if node.module:
-                names = ', '.join(a.name for a in node.names[:5])
-                if len(node.names) > 5:
-                    names += ', ...'
-                skeleton.imports.append(f'from {node.module} import {names}')
-    
-    # Extract classes and functions
-    for node in tree.body:
-        if isinstance(node, ast.ClassDef):
-            skeleton.items.append(extract_class_skeleton(node))
-        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            skeleton.items.append(extract_function_skeleton(node))
+    # Extract imports, classes and functions
+    _SkeletonVisitor(skeleton, _UnparseCache(source)).visit(tree)
     
-    return skeleton
+    # Items only hold strings; drop the tree now rather than at return so a
+    # long batch never has two modules' ASTs alive at once
+    del tree
+    
+    return skeleton, None
+
+
+class _SkeletonVisitor:
+    """
+    Collect a module's imports, classes and functions in one pass.
+    
+    Only top-level statements are looked at, dispatched through a
+    type-keyed handler table like CallGraphBuilder; nested code is never
+    walked. Class bodies are handled by extract_class_skeleton.
+    """
+    
+    def __init__(self, skeleton: FileSkeleton, cache: Optional[_UnparseCache] = None):
+        self.imports = skeleton.imports
+        self.items = skeleton.items
+        self.cache = cache
+    
+    def visit(self, tree: ast.Module):
+        """Dispatch each top-level statement to its handler."""
+        handlers = _SKELETON_HANDLERS
+        for node in tree.body:
+            handler = handlers.get(type(node))
+            if handler is not None:
+                handler(self, node)
+    
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports.append(sys.intern(f'import {alias.name}'))
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module:
+            names = ', '.join(a.name for a in node.names[:5])
+            if len(node.names) > 5:
+                names += ', ...'
+            self.imports.append(sys.intern(f'from {node.module} import {names}'))
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.items.append(extract_class_skeleton(node, self.cache))
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef | ast.AsyncFunctionDef):
+        self.items.append(extract_function_skeleton(node, self.cache))
+
 
+_SKELETON_HANDLERS = {
+    ast.Import: _SkeletonVisitor.visit_Import,
+    ast.ImportFrom: _SkeletonVisitor.visit_ImportFrom,
+    ast.ClassDef: _SkeletonVisitor.visit_ClassDef,
+    ast.FunctionDef: _SkeletonVisitor.visit_FunctionDef,
+    ast.AsyncFunctionDef: _SkeletonVisitor.visit_FunctionDef,
+}
 
-def format_skeleton_item(item: SkeletonItem, indent: str = '') -> List[str]:
-    """Format a skeleton item as code lines."""
-    lines = []
+
+# Indent strings by nesting depth, built once instead of per item
+_INDENTS = tuple('    ' * depth for depth in range(16))
+
+
+def format_skeleton_item(item: SkeletonItem, depth: int = 0) -> List[str]:
+    """Format a skeleton item as code lines, indented depth levels."""
+    lines: List[str] = []
+    _format_item_into(item, lines, depth)
+    return lines
+
+
+def _format_item_into(item: SkeletonItem, lines: List[str], depth: int = 0) -> None:
+    """
+    Append a skeleton item's code lines to lines.
+    
+    Children write into the same list, rather than returning lists that
+    are copied into their parent's at every level.
+    """
+    if depth + 1 < len(_INDENTS):
+        indent, body = _INDENTS[depth], _INDENTS[depth + 1]
+    else:
+        indent, body = '    ' * depth, '    ' * (depth + 1)
     
     # Decorators
     for dec in item.decorators:
-        lines.append(f'{indent}{dec}')
+        lines.append(indent + dec)
     
     # Signature
     lines.append(f'{indent}{item.signature}:')
@@ -268,38 +499,37 @@ def format_skeleton_item(item: SkeletonItem, indent: str = '') -> List[str]:
     # Docstring
     if item.docstring:
         # Single line or multi-line docstring
-        doc_lines = item.docstring.split('\n')
+        # At most 6 pieces: the 5 shown, plus the rest if there is more
+        doc_lines = item.docstring.split('\n', 5)
         if len(doc_lines) == 1 and len(doc_lines[0]) < 60:
-            lines.append(f'{indent}    """{doc_lines[0]}"""')
+            lines.append(f'{body}"""{doc_lines[0]}"""')
         else:
-            lines.append(f'{indent}    """')
+            lines.append(f'{body}"""')
             for doc_line in doc_lines[:5]:  # Limit to 5 lines
-                lines.append(f'{indent}    {doc_line}')
+                lines.append(body + doc_line)
             if len(doc_lines) > 5:
-                lines.append(f'{indent}    ...')
-            lines.append(f'{indent}    """')
+                lines.append(f'{body}...')
+            lines.append(f'{body}"""')
     
     # Children (methods for classes)
     if item.children:
         for child in item.children:
             lines.append('')
-            lines.extend(format_skeleton_item(child, indent + '    '))
+            _format_item_into(child, lines, depth + 1)
     else:
-        lines.append(f'{indent}    ...')
-    
-    return lines
+        lines.append(f'{body}...')
 
 
 def format_file_skeleton(skeleton: FileSkeleton, include_imports: bool = True) -> str:
     """Format file skeleton as Python code."""
-    lines = []
+    lines: List[str] = []
     
     # Module docstring
     if skeleton.module_docstring:
         lines.append('"""')
-        for line in skeleton.module_docstring.split('\n')[:5]:
-            lines.append(line)
-        if len(skeleton.module_docstring.split('\n')) > 5:
+        doc_lines = skeleton.module_docstring.split('\n', 5)
+        lines.extend(doc_lines[:5])
+        if len(doc_lines) > 5:
             lines.append('...')
         lines.append('"""')
         lines.append('')
@@ -314,36 +544,248 @@ def format_file_skeleton(skeleton: FileSkeleton, include_imports: bool = True) -
     
     # Items
     for item in skeleton.items:
-        lines.extend(format_skeleton_item(item))
+        _format_item_into(item, lines)
         lines.append('')
     
     skeleton.skeleton_lines = len(lines)
     return '\n'.join(lines)
 
 
+def _count_item_lines(item: SkeletonItem) -> int:
+    """Number of lines _format_item_into would append for item."""
+    count = len(item.decorators) + 1
+    
+    if item.docstring:
+        doc_lines = item.docstring.split('\n', 5)
+        if len(doc_lines) == 1 and len(doc_lines[0]) < 60:
+            count += 1
+        else:
+            count += 2 + min(len(doc_lines), 5) + (len(doc_lines) > 5)
+    
+    if item.children:
+        count += sum(1 + _count_item_lines(child) for child in item.children)
+    else:
+        count += 1
+    
+    return count
+
+
+def count_skeleton_lines(skeleton: FileSkeleton, include_imports: bool = True) -> int:
+    """
+    Number of lines format_file_skeleton would produce, without formatting.
+    
+    Mirrors format_file_skeleton line for line; keep the two in step.
+    """
+    count = 0
+    
+    if skeleton.module_docstring:
+        doc_lines = skeleton.module_docstring.split('\n', 5)
+        count += 3 + min(len(doc_lines), 5) + (len(doc_lines) > 5)
+    
+    if include_imports and skeleton.imports:
+        count += min(len(skeleton.imports), 10) + (len(skeleton.imports) > 10) + 1
+    
+    count += sum(_count_item_lines(item) + 1 for item in skeleton.items)
+    
+    return count
+
+
+# Below this many files to parse, worker start-up costs more than it saves
+_PARALLEL_MIN_FILES = 64
+
+
+# Per-file skeletons are kept in a sidecar keyed by (mtime, size) so runs
+# only reparse changed files. Bump the version when extraction changes.
+_FILE_CACHE_VERSION = 2
+_PYTHON_VERSION = '%d.%d' % sys.version_info[:2]
+
+
+def get_file_cache_path(root: Path) -> Path:
+    """Get path to the per-file skeleton cache."""
+    return root / '.mcp' / 'skeleton_cache.json'
+
+
+def _load_file_cache(root: Path) -> Dict[str, list]:
+    """Load cached per-file skeletons: path -> [mtime_ns, size, *skeleton]."""
+    try:
+        cache = read_json(get_file_cache_path(root))
+        # ast output differs between Python versions
+        if (cache.get('version') == _FILE_CACHE_VERSION and cache.get('root') == str(root)
+                and cache.get('python') == _PYTHON_VERSION):
+            return cache['files']
+    except Exception:
+        pass
+    return {}
+
+
+def _encode_item(item: SkeletonItem) -> list:
+    """Pack a skeleton item (and its children) as a row."""
+    return [item.name, item.item_type, item.signature, item.docstring,
+            item.line_start, item.line_end, item.decorators,
+            [_encode_item(child) for child in item.children]]
+
+
+def _decode_item(row: list) -> SkeletonItem:
+    """
+    Inverse of _encode_item.
+    
+    Names, kinds and decorators repeat across thousands of items; JSON
+    gives each its own copy, so they are interned (as the parser does).
+    """
+    name, item_type, signature, docstring, line_start, line_end, decorators, children = row
+    intern = sys.intern
+    return SkeletonItem(intern(name), intern(item_type), signature, docstring, line_start, line_end,
+                        [intern(d) for d in decorators], [_decode_item(child) for child in children])
+
+
+def _encode_skeleton(skeleton: FileSkeleton) -> list:
+    """Pack a file skeleton as rows; the path is the cache key."""
+    return [skeleton.module_docstring, skeleton.imports,
+            [_encode_item(item) for item in skeleton.items], skeleton.original_lines]
+
+
+def _decode_skeleton(path: Path, packed: list) -> FileSkeleton:
+    """Inverse of _encode_skeleton."""
+    module_docstring, imports, items, original_lines = packed
+    return FileSkeleton(path=path, module_docstring=module_docstring, imports=[sys.intern(i) for i in imports],
+                        items=[_decode_item(row) for row in items], original_lines=original_lines)
+
+
+def _generate_packed_skeleton(path: Path) -> Tuple[Optional[list], Optional[str]]:
+    """
+    Process-pool worker: a file's skeleton packed as cache rows.
+    
+    Plain lists pickle smaller than the dataclasses, and the main process
+    stores exactly these rows in the cache, so nothing is encoded twice.
+    The AST never leaves the worker.
+    """
+    skeleton, warning = _generate_file_skeleton(path)
+    return (_encode_skeleton(skeleton) if skeleton else None), warning
+
+
+# Files read ahead of the parser when parsing on the main process
+_READ_AHEAD = 16
+
+
+def _extract_serially(paths: List[Path]) -> Iterator[Tuple[Optional[FileSkeleton], Optional[str]]]:
+    """
+    Yield _generate_file_skeleton results for paths, in order.
+    
+    Reads run in a small thread pool up to _READ_AHEAD files ahead of the
+    parse, so on a cold disk the next file loads while this one parses
+    (file reads release the GIL). Worker processes instead read their own
+    files, which overlaps with the other workers' parsing already.
+    """
+    with ThreadPoolExecutor(max_workers=4) as readers:
+        pending: Deque = deque()
+        remaining = iter(paths)
+        for path in islice(remaining, _READ_AHEAD):
+            pending.append((path, readers.submit(_read_source, path)))
+        
+        while pending:
+            path, future = pending.popleft()
+            for next_path in islice(remaining, 1):
+                pending.append((next_path, readers.submit(_read_source, next_path)))
+            
+            source, warning = future.result()
+            yield (None, warning) if source is None else _extract_file_skeleton(path, source)
+
+
 def generate_codebase_skeleton(
     root: Path,
-    exclude_patterns: List[str] = None
+    exclude_patterns: List[str] = None,
+    use_cache: bool = True
 ) -> CodebaseSkeleton:
-    """Generate skeleton for entire codebase."""
+    """
+    Generate skeleton for entire codebase.
+    
+    Files unchanged since the last run are replayed from the skeleton
+    cache. use_cache=False reparses everything. The cache is only written
+    where root/.mcp already exists (a project root), so skeletons of other
+    directories leave no files behind.
+    """
     root = Path(root).resolve()
     
     Console.info(f"Generating skeleton for {root}...")
     
     codebase = CodebaseSkeleton(root=root)
     
-    files = list(find_python_files(root, exclude_patterns))
-    Console.info(f"Found {len(files)} Python files")
+    cache = _load_file_cache(root) if use_cache else {}
+    new_cache: Dict[str, list] = {}
+    results: List[Optional[FileSkeleton]] = []  # one slot per file, in walk order
+    misses = []  # (index, path, [mtime_ns, size] or None)
     
-    for path in files:
-        file_skeleton = generate_file_skeleton(path)
+    # Check each file against the cache as the walk finds it, rather than
+    # listing the whole tree first
+    for i, path in enumerate(find_python_files(root, exclude_patterns)):
+        results.append(None)
+        key = str(path)
+        try:
+            st = path.stat()
+            stamp = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            stamp = None
+        entry = cache.get(key)
+        if stamp and entry and entry[:2] == stamp:
+            results[i] = _decode_skeleton(path, entry[2:])
+            new_cache[key] = entry
+        else:
+            misses.append((i, path, stamp))
+    
+    Console.info(f"Found {len(results)} Python files")
+    if len(misses) < len(results):
+        Console.info(f"Reusing {len(results) - len(misses)} unchanged files")
+    
+    # Files are extracted independently, so spread the parsing over cores.
+    # Only from the main thread: forking while other threads (autocontext's
+    # layer pool) hold locks can deadlock the children
+    paths = [path for _, path, _ in misses]
+    packed = None
+    if (len(paths) >= _PARALLEL_MIN_FILES and (os.cpu_count() or 1) > 1
+            and threading.current_thread() is threading.main_thread()):
+        try:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                packed = list(executor.map(_generate_packed_skeleton, paths, chunksize=16))
+        except Exception as e:
+            Console.warn(f"Parallel parse failed, falling back to serial: {e}")
+    
+    if packed is not None:
+        for (i, path, stamp), (rows, warning) in zip(misses, packed):
+            if warning:
+                Console.warn(warning)
+            if rows:
+                results[i] = _decode_skeleton(path, rows)
+                if stamp:
+                    new_cache[str(path)] = stamp + rows
+    else:
+        for (i, path, stamp), (file_skeleton, warning) in zip(misses, _extract_serially(paths)):
+            if warning:
+                Console.warn(warning)
+            results[i] = file_skeleton
+            if stamp and file_skeleton:
+                new_cache[str(path)] = stamp + _encode_skeleton(file_skeleton)
+    
+    # Totals are summed on the main process, in file order
+    for file_skeleton in results:
         if file_skeleton:
-            # Generate formatted content to count lines
-            format_file_skeleton(file_skeleton, include_imports=False)
+            # Count lines as formatted, without formatting the file yet
+            file_skeleton.skeleton_lines = count_skeleton_lines(file_skeleton, include_imports=False)
             codebase.files.append(file_skeleton)
             codebase.total_original_lines += file_skeleton.original_lines
             codebase.total_skeleton_lines += file_skeleton.skeleton_lines
     
+    cache_path = get_file_cache_path(root)
+    if use_cache and (misses or len(new_cache) != len(cache)) and cache_path.parent.is_dir():
+        try:
+            write_json(cache_path, {
+                'version': _FILE_CACHE_VERSION,
+                'root': str(root),
+                'python': _PYTHON_VERSION,
+                'files': new_cache,
+            })
+        except OSError as e:
+            Console.warn(f"Could not save skeleton cache: {e}")
+    
     if codebase.total_original_lines > 0:
         codebase.compression_ratio = 1 - (codebase.total_skeleton_lines / codebase.total_original_lines)
     
@@ -355,7 +797,7 @@ def generate_codebase_skeleton(
 
 def format_codebase_skeleton_markdown(codebase: CodebaseSkeleton) -> str:
     """Format codebase skeleton as Markdown."""
-    lines = [
+    lines: List[str] = [
         "# Codebase Skeleton",
         "",
         f"**Root:** `{codebase.root}`",
@@ -394,12 +836,12 @@ def get_skeleton_for_context(root: Path, max_tokens: int = 4000) -> str:
     # Estimate ~4 chars per token
     max_chars = max_tokens * 4
     
-    lines = [
+    lines: List[str] = [
         "# Codebase Structure",
         "",
     ]
     
-    char_count = 0
+    char_count: int = 0
     
     for file_skeleton in codebase.files:
         try:
@@ -411,13 +853,13 @@ def get_skeleton_for_context(root: Path, max_tokens: int = 4000) -> str:
         header = f"\n## {relative}\n"
         
         # Just list classes and functions with signatures
-        items_lines = []
+        items_lines: List[str] = []
         for item in file_skeleton.items:
             # Class with methods summarized
             if item.item_type == 'class':
                 items_lines.append(item.signature + ':')
                 if item.docstring:
-                    first_line = item.docstring.split('\n')[0][:60]
+                    first_line = item.docstring.partition('\n')[0][:60]
                     items_lines.append(f'    """{first_line}"""')
                 for method in item.children[:5]:  # Limit methods shown
                     items_lines.append(f'    {method.signature}: ...')
@@ -426,7 +868,7 @@ def get_skeleton_for_context(root: Path, max_tokens: int = 4000) -> str:
             else:
                 items_lines.append(item.signature + ': ...')
                 if item.docstring:
-                    first_line = item.docstring.split('\n')[0][:60]
+                    first_line = item.docstring.partition('\n')[0][:60]
                     items_lines.append(f'    # {first_line}')
         
         file_content = header + '\n'.join(items_lines)
@@ -445,14 +887,15 @@ def main():
     """CLI entry point."""
     Console.header("Code Skeleton Generator")
     
-    args = [a for a in sys.argv[1:] if not a.startswith('-')]
-    
+    # One pass over the arguments; the value after --output is not a path
+    args = []
     output_file = None
-    for i, arg in enumerate(sys.argv):
-        if arg == '--output' and i + 1 < len(sys.argv):
-            output_file = Path(sys.argv[i + 1])
-        elif arg == '--output':
-            output_file = Path('SKELETON.md')
+    argv = iter(sys.argv[1:])
+    for arg in argv:
+        if arg == '--output':
+            output_file = Path(next(argv, 'SKELETON.md'))
+        elif not arg.startswith('-'):
+            args.append(arg)
     
     # Get path
     if args:
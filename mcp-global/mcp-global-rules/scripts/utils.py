@@ -3,7 +3,7 @@ MCP Global Rules - Shared Utilities
 ====================================
 Core utility functions used by all AI agent enhancement tools.
 
-Python 3.11+ compatible, uses only stdlib.
+Python 3.11+ compatible, uses only stdlib (orjson is used when installed).
 """
 
 from dataclasses import dataclass, field
@@ -11,9 +11,19 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Iterator, Tuple
 import ast
+import functools
 import json
+import mmap
 import os
 import subprocess
+import tempfile
+
+# Try orjson for faster JSON encode/decode
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 
 # =============================================================================
@@ -118,6 +128,10 @@ def find_python_files(
             yield item
 
 
+# Files or directories whose presence marks a project root
+_ROOT_MARKERS = ('.git', 'pyproject.toml', 'setup.py', 'setup.cfg', '.mcp')
+
+
 def find_project_root(start: Path = None) -> Optional[Path]:
     """
     Find the project root by looking for common markers.
@@ -144,11 +158,9 @@ def find_project_root(start: Path = None) -> Optional[Path]:
         # If start is outside boundary, use boundary as start
         start = boundary
 
-    markers = ['.git', 'pyproject.toml', 'setup.py', 'setup.cfg', '.mcp']
-
     # helper to check markers
     def check_dir(d: Path) -> bool:
-        for marker in markers:
+        for marker in _ROOT_MARKERS:
             if (d / marker).exists():
                 return True
         return False
@@ -246,6 +258,50 @@ def get_project_boundary(start: Path = None) -> Optional[Path]:
     return None
 
 
+def resolve_project_root() -> Path:
+    """
+    Resolve the project root for the current working directory.
+
+    Equivalent to get_project_boundary() or find_project_root() or cwd,
+    but cached per cwd so repeated calls in one process don't walk the
+    filesystem again. The result is also exported as MCP_PROJECT_ROOT so
+    child MCP commands (e.g. several run from one git hook) can skip the
+    full walk while they stay inside that root; below it they only check
+    for a nested project between cwd and the exported root.
+
+    Returns:
+        The project root path
+    """
+    cwd = os.getcwd()
+    project_root_env = os.environ.get('PROJECT_ROOT', '')
+
+    cached = os.environ.get('MCP_PROJECT_ROOT')
+    if cached and not project_root_env:
+        cached_prefix = cached.rstrip(os.sep) + os.sep
+        if cwd == cached or (cwd.startswith(cached_prefix) and not _has_nested_root(cwd, cached)):
+            return Path(cached)
+
+    root = _resolve_project_root(cwd, project_root_env)
+    os.environ['MCP_PROJECT_ROOT'] = str(root)
+    return root
+
+
+def _has_nested_root(cwd: str, root: str) -> bool:
+    """Check whether a directory from cwd up to (not including) root has a root marker."""
+    current, stop = Path(cwd), Path(root)
+    while current != stop and current != current.parent:
+        if any((current / marker).exists() for marker in _ROOT_MARKERS):
+            return True
+        current = current.parent
+    return False
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_project_root(cwd: str, project_root_env: str) -> Path:
+    """Cached worker for resolve_project_root (keyed by cwd and PROJECT_ROOT)."""
+    return get_project_boundary() or find_project_root() or Path(cwd)
+
+
 def is_path_within_boundary(path: Path, boundary: Path) -> bool:
     """
     Check if a path is within the project boundary.
@@ -297,6 +353,104 @@ def validate_path_in_project(path: Path, project_root: Path = None) -> Path:
     return resolved_path
 
 
+# =============================================================================
+# FILE I/O
+# =============================================================================
+
+@functools.lru_cache(maxsize=1)
+def _new_file_mode() -> int:
+    """Mode a plain open() would give a new file under the current umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def write_atomic(path: Path, data: str | bytes, encoding: str = 'utf-8'):
+    """
+    Write a file atomically.
+
+    Data goes to a temp file in the same directory which is then renamed
+    over the target, so readers never see a half-written file.
+
+    Args:
+        path: Destination file
+        data: Text or bytes to write
+        encoding: Encoding used when data is text
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if isinstance(data, str):
+        data = data.encode(encoding)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates 0600 files; keep the target's mode (or the default)
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = _new_file_mode()
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def json_dumps(data: Any, indent: bool = False) -> bytes:
+    """
+    Serialize data to JSON bytes.
+
+    Output is compact unless indent is set. Uses orjson when available.
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+
+    if indent:
+        return json.dumps(data, indent=2).encode('utf-8')
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Parse JSON text or bytes. Uses orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Files at least this big are memory-mapped instead of read into a copy
+_MMAP_MIN_BYTES = 1024 * 1024
+
+
+def read_json(path: Path) -> Any:
+    """
+    Read and parse a JSON file.
+
+    With orjson, large files are parsed straight from a memory map, so the
+    raw bytes are never copied into a Python object first.
+    """
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size >= _MMAP_MIN_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    return orjson.loads(view)
+            return orjson.loads(f.read())
+    return json_loads(Path(path).read_bytes())
+
+
+def write_json(path: Path, data: Any, indent: bool = False):
+    """Serialize data and write it atomically to a JSON file."""
+    write_atomic(path, json_dumps(data, indent=indent))
+
+
 # =============================================================================
 # AST PARSING
 # =============================================================================
@@ -511,6 +665,47 @@ def run_git_command(args: List[str], cwd: Path = None) -> Optional[str]:
         return None
 
 
+def stream_git_command(args: List[str], cwd: Path = None, sep: bytes = b'\n') -> Iterator[bytes]:
+    """
+    Run a git command and yield raw output records as they arrive.
+
+    Output is read in chunks and split on sep (use b'\0' with git's -z),
+    so it is never held in memory as a whole and nothing is decoded.
+    Yields nothing if git can't be started.
+
+    Args:
+        args: Git command arguments
+        cwd: Working directory
+        sep: Record separator
+    """
+    try:
+        proc = subprocess.Popen(
+            ['git'] + args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd or Path.cwd()
+        )
+    except Exception:
+        return
+
+    try:
+        pending = b''
+        while True:
+            chunk = proc.stdout.read(65536)
+            if not chunk:
+                break
+            *records, pending = (pending + chunk).split(sep)
+            yield from records
+        if pending:
+            yield pending
+    finally:
+        proc.stdout.close()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
 def get_git_log(
     count: int = 50,
     cwd: Path = None
@@ -37,6 +37,14 @@ except ImportError:
     NUMPY_AVAILABLE = False
 
 
+# Below this many vectors an exact scan is as fast as a graph search
+HNSW_MIN_VECTORS = 5000
+
+# HNSW graph degree and search breadth (efSearch >> k keeps top-10 recall)
+HNSW_M = 32
+HNSW_EF_SEARCH = 64
+
+
 @dataclass
 class CodeChunk:
     """A chunk of code with metadata."""
@@ -186,8 +194,14 @@ class VectorStore:
 
         dim = len(next(iter(self.embeddings.values())))
 
-        # Create index
-        self._faiss_index = faiss.IndexFlatIP(dim)  # Inner product = cosine for normalized
+        # Create index (inner product = cosine for normalized vectors).
+        # Large stores use an HNSW graph: logarithmic search instead of a
+        # linear scan, at a negligible recall cost for top-k.
+        if len(self.embeddings) >= HNSW_MIN_VECTORS:
+            self._faiss_index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            self._faiss_index.hnsw.efSearch = HNSW_EF_SEARCH
+        else:
+            self._faiss_index = faiss.IndexFlatIP(dim)
 
         # Add vectors
         ids = list(self.embeddings.keys())
@@ -199,6 +213,8 @@ class VectorStore:
         self._faiss_index.add(vectors)
 
         # Build ID mappings
+        self._id_to_idx = {}
+        self._idx_to_id = {}
         for idx, id in enumerate(ids):
             self._id_to_idx[id] = idx
             self._idx_to_id[idx] = id
@@ -213,6 +229,13 @@ class VectorStore:
         if query_emb is None:
             return []
 
+        return self.search_with_embedding(query_emb, k)
+
+    def search_with_embedding(self, query_emb: List[float], k: int = 10) -> List[SearchResult]:
+        """Search using an already computed query embedding."""
+        if not self.embeddings:
+            return []
+
         # Use FAISS if available
         if self._faiss_index is not None and NUMPY_AVAILABLE:
             return self._faiss_search(query_emb, k)
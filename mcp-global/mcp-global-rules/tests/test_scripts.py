@@ -119,6 +119,20 @@ class TestUtils:
         if not len(info.classes) >= 1:
             raise AssertionError("Should identify at least 1 class")
 
+    def test_resolve_project_root_nested(self, temp_project, monkeypatch):
+        """Test an exported root is not reused inside a nested project."""
+        from scripts.utils import resolve_project_root
+
+        nested = temp_project / "src"
+        (nested / ".mcp").mkdir()
+        (nested / ".mcp" / "project_root").write_text("")
+
+        monkeypatch.delenv('PROJECT_ROOT', raising=False)
+        monkeypatch.setenv('MCP_PROJECT_ROOT', str(temp_project.resolve()))
+        monkeypatch.chdir(nested)
+        if resolve_project_root() != nested.resolve():
+            raise AssertionError("Nested project should be resolved, not the exported root")
+
     def test_format_as_markdown_table(self):
         """Test markdown table formatting."""
         from scripts.utils import format_as_markdown_table
@@ -325,5 +339,280 @@ eval(user_input)
             os.unlink(f.name)
 
 
+class TestAutoHeal:
+    """Tests for auto_heal.py module."""
+
+    def test_analyze_error_builtin(self, temp_project):
+        """Test matching a built-in pattern fills in the fix."""
+        from scripts.auto_heal import analyze_error
+
+        analysis = analyze_error("NameError: name 'foo' is not defined", temp_project)
+        if analysis.category != "NameError":
+            raise AssertionError("Should categorize as NameError")
+        if "'foo' is not defined" not in analysis.suggested_fix:
+            raise AssertionError("Fix should mention the undefined name")
+
+    def test_match_patterns_priority(self):
+        """Test earlier patterns win even when they match later in the text."""
+        from scripts.auto_heal import BUILTIN_PATTERNS, match_patterns
+
+        text = "ValueError: bad\nModuleNotFoundError: No module named 'requests'"
+        index, groups = match_patterns(BUILTIN_PATTERNS, text)
+        if BUILTIN_PATTERNS[index].category != "ImportError":
+            raise AssertionError("Earlier pattern should take priority")
+        if groups != ("requests",):
+            raise AssertionError("Should capture the module name")
+
+    def test_match_patterns_overlapping(self):
+        """Test an earlier pattern wins when its match overlaps a later one."""
+        from scripts.auto_heal import BUILTIN_PATTERNS, ErrorPattern, match_patterns
+
+        index, groups = match_patterns(BUILTIN_PATTERNS, "ValueError: could not convert KeyError: 'abc'")
+        if BUILTIN_PATTERNS[index].category != "KeyError" or groups != ("abc",):
+            raise AssertionError("Earlier pattern should win inside a later match")
+
+        quoted = ErrorPattern(pattern=r"(['\"])(\w+)\1 failed", category="Quoted",
+                              description="Quoted failure", fix="{match2}")
+        index, groups = match_patterns(BUILTIN_PATTERNS + [quoted], "'job' failed")
+        if index != len(BUILTIN_PATTERNS) or groups != ("'", "job"):
+            raise AssertionError("Backreferences should refer to their own pattern")
+
+    def test_render_fix_literal_braces(self):
+        """Test placeholders are filled even when the template has other braces."""
+        from scripts.auto_heal import render_fix
+
+        fix = render_fix("Install {match}; or set cfg = {} for '{match1}' {match2}", ("requests",))
+        if fix != "Install requests; or set cfg = {} for 'requests' ":
+            raise AssertionError("Only match placeholders should be replaced")
+
+
+class TestAutoLearn:
+    """Tests for auto_learn.py module."""
+
+    def test_record_and_predict_next_files(self, temp_project):
+        """Test recorded access sequences drive next-file predictions."""
+        from scripts.auto_learn import record_file_accesses, predict_next_files
+
+        first = str(temp_project / "src" / "module.py")
+        record_file_accesses([first, "sample.py", first, "no_docs.py", first, "sample.py"],
+                             temp_project, defer=False)
+
+        predictions = predict_next_files(first, temp_project)
+        if [f for f, _ in predictions] != ["sample.py", "no_docs.py"]:
+            raise AssertionError("Most frequent follower should rank first")
+
+
+class TestAutoContext:
+    """Tests for autocontext.py module."""
+
+    def test_dependency_context_sees_new_files(self, temp_project):
+        """Test imports resolve to files added after the first lookup."""
+        from scripts.autocontext import get_dependency_context
+
+        importer = temp_project / "importer.py"
+        importer.write_text("import helper\n")
+        if get_dependency_context(importer, temp_project).files:
+            raise AssertionError("Missing module should not resolve")
+
+        (temp_project / "helper.py").write_text("VALUE = 1\n")
+        files = get_dependency_context(importer, temp_project).files
+        if [Path(f).name for f, _ in files] != ["helper.py"]:
+            raise AssertionError("New module should be found")
+
+
+class TestCallGraph:
+    """Tests for call_graph.py module."""
+
+    def test_build_and_query(self, temp_project):
+        """Test building the graph and querying callers/callees."""
+        from scripts.call_graph import build_call_graph, query_graph
+
+        graph = build_call_graph(temp_project)
+        if "sample.SampleClass.get_name" not in graph.nodes:
+            raise AssertionError("Should index methods by qualified name")
+
+        result = query_graph(graph, "sample_function")
+        if result['node']['node_type'] != 'function':
+            raise AssertionError("Should find the function node")
+
+    def test_load_reuses_unchanged_graph(self, temp_project):
+        """Test a saved graph is parsed again only after the file changes."""
+        from scripts.call_graph import build_call_graph, load_call_graph, save_call_graph
+
+        save_call_graph(build_call_graph(temp_project), temp_project)
+        first = load_call_graph(temp_project)
+        if load_call_graph(temp_project) is not first:
+            raise AssertionError("Unchanged graph file should not be parsed again")
+
+        graph_file = temp_project / '.mcp' / 'call_graph.json'
+        st = graph_file.stat()
+        os.utime(graph_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        if load_call_graph(temp_project) is first:
+            raise AssertionError("Changed graph file should be loaded again")
+
+
+class TestProjectState:
+    """Tests for project_state.py module."""
+
+    def test_journal_replay_and_compact(self, temp_project):
+        """Test journaled changes replay on load and fold into the state file."""
+        from scripts.project_state import get_journal_path, get_state_path, load_state, record_change
+
+        state = load_state(temp_project)
+        record_change(state, 'set_task', 'a', temp_project)
+        record_change(state, 'add_task', 'b', temp_project)
+        record_change(state, 'learn', 'x', temp_project)
+        if get_state_path(temp_project).exists():
+            raise AssertionError("Changes should only be journaled")
+
+        loaded = load_state(temp_project)
+        if (loaded.current_active_task, loaded.next_step_queue, loaded.lessons_learned) != ('a', ['b'], ['x']):
+            raise AssertionError("Load should replay the journal")
+
+        record_change(loaded, 'complete', root=temp_project, compact=True)
+        if get_journal_path(temp_project).exists():
+            raise AssertionError("Compacting should remove the folded journal")
+        compacted = load_state(temp_project)
+        if (compacted.completed_milestones, compacted.current_active_task) != (['a'], 'b'):
+            raise AssertionError("Compacted state should keep every change")
+
+    def test_journal_torn_line(self, temp_project):
+        """Test a torn last line is skipped without losing later changes."""
+        from scripts.project_state import get_journal_path, load_state, record_change
+
+        record_change(load_state(temp_project), 'add_task', 'a', temp_project)
+        with open(get_journal_path(temp_project), 'ab') as f:
+            f.write(b'{"op": "add_ta')
+
+        state = load_state(temp_project)
+        if state.next_step_queue != ['a']:
+            raise AssertionError("Torn line should be ignored")
+        record_change(state, 'add_task', 'b', temp_project)
+        if load_state(temp_project).next_step_queue != ['a', 'b']:
+            raise AssertionError("Entry after a torn line should survive")
+
+    def test_journal_concurrent_appends(self, temp_project):
+        """Test compacting keeps changes another process journaled."""
+        from scripts.project_state import load_state, record_change
+
+        first, second = load_state(temp_project), load_state(temp_project)
+        record_change(second, 'add_task', 'b', temp_project)
+        record_change(first, 'add_task', 'c', temp_project)
+        record_change(first, 'complete', root=temp_project, compact=True)
+
+        if load_state(temp_project).next_step_queue != ['b', 'c']:
+            raise AssertionError("Other process's change should not be lost")
+
+
+class TestSkeleton:
+    """Tests for skeleton.py module."""
+
+    def test_cached_skeleton_matches_fresh(self, temp_project):
+        """Test a rerun replays unchanged files from the skeleton cache."""
+        from scripts.skeleton import (
+            format_codebase_skeleton_markdown, generate_codebase_skeleton, get_file_cache_path
+        )
+
+        fresh = generate_codebase_skeleton(temp_project, use_cache=False)
+        generate_codebase_skeleton(temp_project)
+        if (temp_project / ".mcp").exists():
+            raise AssertionError("Cache should not create .mcp outside a project")
+
+        (temp_project / ".mcp").mkdir()
+        generate_codebase_skeleton(temp_project)
+        if not get_file_cache_path(temp_project.resolve()).exists():
+            raise AssertionError("First cached run should write the cache")
+
+        cached = generate_codebase_skeleton(temp_project)
+        if format_codebase_skeleton_markdown(cached) != format_codebase_skeleton_markdown(fresh):
+            raise AssertionError("Cached skeletons should format like fresh ones")
+
+    def test_count_matches_format(self, temp_project):
+        """Test counted skeleton lines match the formatted output."""
+        from scripts.skeleton import count_skeleton_lines, format_file_skeleton, generate_file_skeleton
+
+        skeleton = generate_file_skeleton(temp_project / "sample.py")
+        for include_imports in (True, False):
+            format_file_skeleton(skeleton, include_imports=include_imports)
+            if count_skeleton_lines(skeleton, include_imports=include_imports) != skeleton.skeleton_lines:
+                raise AssertionError("Counted lines should match formatted lines")
+
+    def test_fast_unparse_matches_unparse(self):
+        """Test the unparse fast path renders simple defaults like ast.unparse."""
+        import ast
+        from scripts.skeleton import _fast_unparse
+
+        tree = ast.parse("def f(a=None, b=-1, c='x', d=u'x', e=os.sep, f=\"it's\"): pass")
+        for node in tree.body[0].args.defaults:
+            fast = _fast_unparse(node)
+            if fast is not None and fast != ast.unparse(node):
+                raise AssertionError(f"Fast path should match ast.unparse: {fast}")
+
+    def test_skeleton_holds_no_ast_nodes(self, temp_project):
+        """Test a skeleton keeps no reference to the parsed tree."""
+        import ast
+        import gc
+        from scripts.skeleton import generate_file_skeleton
+
+        path = temp_project / "decorated.py"
+        path.write_text(
+            "import os\n"
+            "@dataclass(frozen=True)\n"
+            "class Point(Base, metaclass=Meta):\n"
+            "    \"\"\"A point.\"\"\"\n"
+            "    x: int = 0\n"
+            "    @property\n"
+            "    def norm(self, *, p: float = 2.0) -> float:\n"
+            "        return 0.0\n"
+            "async def fetch(url: str = 'x', **kw) -> dict:\n"
+            "    def inner(): pass\n"
+            "    return {}\n"
+        )
+        skeleton = generate_file_skeleton(path)
+
+        seen, stack = set(), [skeleton]
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen or isinstance(obj, type):
+                continue
+            seen.add(id(obj))
+            if isinstance(obj, ast.AST):
+                raise AssertionError("Skeleton should not reference AST nodes")
+            stack.extend(gc.get_referents(obj))
+
+
+class TestHybridGraph:
+    """Tests for hybrid_graph.py module."""
+
+    def test_save_and_load_shards(self, temp_project):
+        """Test a saved graph loads back whole or section by section."""
+        from scripts.hybrid_graph import (
+            HybridGraph, HybridNode, load_hybrid_graph, load_hybrid_graph_meta, save_hybrid_graph
+        )
+
+        graph = HybridGraph(root=temp_project)
+        for name in ("a.py", "b.py", "c.py"):
+            path = str(temp_project / name)
+            graph.add_node(HybridNode(id=path, node_type='file', path=path, name=name))
+        a, b, c = (str(temp_project / n) for n in ("a.py", "b.py", "c.py"))
+        graph.add_edge(b, a, 'imports')
+        graph.record_comodifications([[a, b, c], [a, c]])
+        save_hybrid_graph(graph)
+
+        meta = load_hybrid_graph_meta(temp_project)
+        if meta['edge_count'] != 3 or meta['edge_types']['modified_together'] != 3:
+            raise AssertionError("Meta should summarize edges")
+
+        loaded = load_hybrid_graph(temp_project)
+        if loaded.get_edge(a, b).relationship_types != ['imports', 'modified_together']:
+            raise AssertionError("Edges should be found in either direction")
+        if loaded.neighbors[a] != {b, c}:
+            raise AssertionError("Neighbors should be rebuilt from edges")
+
+        comod = load_hybrid_graph(temp_project, parts=('comod_matrix',))
+        if comod.nodes or comod.comod_matrix[a][c] != 2:
+            raise AssertionError("Partial load should read only the requested shard")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])